@@ -1,28 +1,75 @@
 import { spawn } from "child_process";
 
 let pyProcess = null;
+let pyPaused = false;
 
-export const startDetector = (req, res) => {
-  try {
-    if (pyProcess) {
-      return res.json({ success: true, message: "Detector already running" });
-    }
+// Keep stream_server.py alive between stop/start and just pause it, so a
+// restart skips the cold model load. Set DETECTOR_RESIDENT=false to kill it.
+const DETECTOR_RESIDENT = process.env.DETECTOR_RESIDENT !== "false";
+const DETECTOR_URL = process.env.DETECTOR_URL || "http://localhost:5001";
+const CONTROL_TIMEOUT_MS = 5000; // a hung server must not hang the API request
 
-    pyProcess = spawn("./detector/venv/bin/python", ["./detector/stream_server.py"]);
+const detectorControl = async (action) => {
+  const r = await fetch(`${DETECTOR_URL}/control/${action}`, {
+    method: "POST",
+    signal: AbortSignal.timeout(CONTROL_TIMEOUT_MS),
+  });
+  if (!r.ok) throw new Error(`detector answered ${r.status} to ${action}`);
+  return r.json();
+};
 
+const spawnDetector = () => {
+  const proc = spawn("./detector/venv/bin/python", ["./detector/stream_server.py"]);
 
-    pyProcess.stdout.on("data", (data) => {
-      console.log("PY:", data.toString());
-    });
+  proc.stdout.on("data", (data) => {
+    console.log("PY:", data.toString());
+  });
 
-    pyProcess.stderr.on("data", (data) => {
-      console.log("PY ERR:", data.toString());
-    });
+  proc.stderr.on("data", (data) => {
+    console.log("PY ERR:", data.toString());
+  });
 
-    pyProcess.on("close", () => {
+  proc.on("close", () => {
+    // a killed process may close after its replacement was spawned
+    if (pyProcess === proc) {
       pyProcess = null;
-      console.log("✅ Detector stopped");
-    });
+      pyPaused = false;
+    }
+    console.log("✅ Detector stopped");
+  });
+
+  pyProcess = proc;
+  pyPaused = false;
+};
+
+const killDetector = () => {
+  pyProcess.kill();
+  pyProcess = null;
+  pyPaused = false;
+};
+
+export const startDetector = async (req, res) => {
+  try {
+    if (pyProcess && pyPaused) {
+      try {
+        const state = await detectorControl("resume");
+        if (state.state !== "error") {
+          pyPaused = false;
+          return res.json({ success: true, message: "✅ Detector resumed", state });
+        }
+        console.log("Detector resume failed, restarting:", state.error);
+      } catch (err) {
+        // hung or crashed without a close event: replace the process
+        console.log("Detector resume failed, restarting:", err.message);
+      }
+      killDetector();
+    }
+
+    if (pyProcess) {
+      return res.json({ success: true, message: "Detector already running" });
+    }
+
+    spawnDetector();
 
     res.json({ success: true, message: "✅ Detector started" });
   } catch (err) {
@@ -30,14 +77,25 @@ export const startDetector = (req, res) => {
   }
 };
 
-export const stopDetector = (req, res) => {
+export const stopDetector = async (req, res) => {
   try {
     if (!pyProcess) {
       return res.json({ success: true, message: "Detector not running" });
     }
 
-    pyProcess.kill();
-    pyProcess = null;
+    // already paused: a second stop really ends the process
+    if (DETECTOR_RESIDENT && !pyPaused) {
+      try {
+        const state = await detectorControl("pause");
+        pyPaused = true;
+        return res.json({ success: true, message: "🛑 Detector paused", state });
+      } catch (err) {
+        // server not answering (still loading or hung): fall back to killing it
+        console.log("Detector pause failed, killing:", err.message);
+      }
+    }
+
+    killDetector();
 
     res.json({ success: true, message: "🛑 Detector stopped" });
   } catch (err) {
@@ -52,7 +110,8 @@ export const saveDetection = (req, res) => {
 export const statusDetector = (req, res) => {
   return res.json({
     success: true,
-    running: !!pyProcess,
-    message: pyProcess ? "Detector is running" : "Detector is stopped",
+    running: !!pyProcess && !pyPaused,
+    paused: pyPaused,
+    message: !pyProcess ? "Detector is stopped" : pyPaused ? "Detector is paused" : "Detector is running",
   });
 };
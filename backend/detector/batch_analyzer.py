@@ -0,0 +1,208 @@
+# Offline analyzer for recorded study sessions / lecture videos.
+#
+# The expensive part of the live loop (FaceMesh + head pose, YOLO phone
+# check) only looks at one frame at a time, so videos are cut into chunks of
+# CHUNK_SEC and the chunks are analyzed on a process pool, one model set per
+# worker process. The status / focus-score state machine does depend on the
+# previous frames (away timer, score), so it runs afterwards in the parent
+# over the per-frame observations in video order, with video time as the
+# clock (focus_engine.score_batch, the same rules as live). Rows go through
+# the same IntervalAggregator + FocusLogWriter as the live monitor, so the
+# day CSVs look exactly like live ones.
+#
+# Usage:
+#   python batch_analyzer.py session.mp4 [more.mp4 ...] [--workers 4]
+#       [--chunk-sec 60] [--sample-fps 10] [--start "2026-03-01 09:00:00"]
+#       [--log-dir batch_logs] [--log-format csv]
+#
+# or from Python: analyze_videos(["session.mp4"], workers=4)
+import os
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from detector_settings import (
+    PHONE_DETECT_EVERY_N, PHONE_DETECT_EVERY_N_ACTIVE, PHONE_MOTION_THRESHOLD, PHONE_DETECTOR_MODE,
+    PHONE_DETECTOR_IMGSZ, PHONE_DETECTOR_BACKEND, FACE_ROI_MARGIN, FACE_MAX_SIDE,
+    FACE_FULL_FRAME_EVERY,
+)
+from focus_engine import STATUS_LABELS, score_batch
+from focus_log import IntervalAggregator, start_log_writer
+
+# ===== Settings =====
+LOG_DIR = "batch_logs"           # kept apart from the live focus_logs by default
+LOG_INTERVAL_SEC = 1.0
+LOG_FORMAT = "csv"               # csv / parquet / both
+CHUNK_SEC = 60.0                 # video seconds per pool task
+SAMPLE_FPS = 10.0                # frames analyzed per video second (0 = every frame); ~ live loop rate
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# ===========================
+
+
+# ----- Video chunks -----
+def video_info(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    return fps, frames
+
+
+def make_chunks(path, fps, frames, chunk_sec=CHUNK_SEC, sample_fps=SAMPLE_FPS):
+    """(path, first_frame, end_frame, step) tasks; end_frame None = read to the end."""
+    step = max(1, int(round(fps / sample_fps))) if sample_fps else 1
+    if frames <= 0:
+        return [(path, 0, None, step)]  # unknown length (some webm/mkv): one chunk
+    size = max(step, int(chunk_sec * fps) // step * step)  # chunk starts stay on the sample grid
+    return [(path, start, min(start + size, frames), step) for start in range(0, frames, size)]
+
+
+# ----- Worker process -----
+_face_mesh = None
+_roi_face_mesh = None
+_phone_detector = None
+
+
+def _init_worker(threads=1):
+    # one FaceMesh + phone detector per process, reused for every chunk it gets
+    global _face_mesh, _roi_face_mesh, _phone_detector
+    import mediapipe as mp
+    from phone_detector import create_phone_detector
+    cv2.setNumThreads(1)  # parallelism comes from the pool
+    _face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
+    _roi_face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
+    _phone_detector = create_phone_detector(PHONE_DETECTOR_BACKEND, mode=PHONE_DETECTOR_MODE,
+                                            imgsz=PHONE_DETECTOR_IMGSZ, threads=threads)
+
+
+def analyze_chunk(task):
+    """Runs the models over one chunk -> [(frame_index, faces_detected, gaze_status, phone_detected)]."""
+    from face_tracker import RoiFaceMesh
+    from head_pose import head_pose_from_points
+    from phone_detector import PhoneScheduler
+
+    path, first, end, step = task
+    # tracker / scheduler state is per chunk: the first frame does a full scan
+    face_tracker = RoiFaceMesh(_face_mesh, _roi_face_mesh, margin=FACE_ROI_MARGIN, max_side=FACE_MAX_SIDE,
+                               full_frame_every=FACE_FULL_FRAME_EVERY)
+    phone_scheduler = PhoneScheduler(_phone_detector, idle_every_n=PHONE_DETECT_EVERY_N,
+                                     active_every_n=PHONE_DETECT_EVERY_N_ACTIVE,
+                                     motion_threshold=PHONE_MOTION_THRESHOLD)
+
+    cap = cv2.VideoCapture(path)
+    if first:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    out = []
+    index = first
+    while end is None or index < end:
+        if index % step:
+            ok = cap.grab()  # skipped frame: no decode
+        else:
+            ok, frame = cap.read()
+        if not ok:
+            break
+        if index % step == 0:
+            faces = face_tracker.process(frame)
+            gaze_status = "away"
+            if len(faces) == 1:
+                gaze_status = head_pose_from_points(faces[0], frame.shape[:2])
+            phone_detected, _ = phone_scheduler.update(frame)
+            out.append((index, len(faces), gaze_status, bool(phone_detected)))
+        index += 1
+    cap.release()
+    return out
+
+
+def recording_start(path, fps, frames):
+    # file mtime is when recording stopped; step back by the video length
+    duration = frames / fps if frames > 0 else 0.0
+    return os.path.getmtime(path) - duration
+
+
+# ----- Driver -----
+def analyze_videos(paths, workers=WORKERS, chunk_sec=CHUNK_SEC, sample_fps=SAMPLE_FPS,
+                   start=None, log_dir=LOG_DIR, log_format=LOG_FORMAT):
+    """Analyze videos on a process pool and write live-format log rows.
+
+    start: datetime of the first video's first frame (default: from the file
+    mtime); later videos follow their own mtimes. Returns per-video stats.
+    """
+    writer = start_log_writer(log_dir, log_format=log_format)
+    results = []
+    # split the cores between the pool processes (torch / onnxruntime default to all of them)
+    threads = max(1, (os.cpu_count() or 1) // max(1, workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        for n, path in enumerate(paths):
+            t0 = time.time()
+            fps, frames = video_info(path)
+            chunks = make_chunks(path, fps, frames, chunk_sec, sample_fps)
+            t_start = start.timestamp() if (start is not None and n == 0) else recording_start(path, fps, frames)
+
+            # map() hands results back in chunk order, so this is the whole video in order
+            observations = [obs for chunk in pool.map(analyze_chunk, chunks) for obs in chunk]
+            if not observations:
+                continue
+            index, faces, gaze, phone = (np.array(col) for col in zip(*observations))
+            t = t_start + index / fps
+            codes, scores = score_batch(t, faces, gaze, phone)
+
+            aggregator = IntervalAggregator(LOG_INTERVAL_SEC)
+            rows = 0
+            for i in range(len(t)):
+                row = aggregator.add(t[i], STATUS_LABELS[codes[i]], gaze[i], int(faces[i]),
+                                     bool(phone[i]), int(round(scores[i])))
+                if row is not None:
+                    writer.log(row)
+                    rows += 1
+            video_sec = (int(index[-1]) + 1) / fps
+            # the last sampled frame holds until the end of the video
+            row = aggregator.finish(t_start + video_sec)
+            if row is not None:
+                writer.log(row)
+                rows += 1
+
+            analyzed = len(observations)
+            wall = time.time() - t0
+            results.append({
+                "path": path,
+                "chunks": len(chunks),
+                "frames_analyzed": analyzed,
+                "video_sec": round(video_sec, 1),
+                "wall_sec": round(wall, 1),
+                "speedup": round(video_sec / wall, 1) if wall > 0 else None,
+                "rows": rows,
+                "first_row": datetime.fromtimestamp(t_start).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+    writer.close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-score recorded study videos into focus logs")
+    ap.add_argument("videos", nargs="+")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--chunk-sec", type=float, default=CHUNK_SEC)
+    ap.add_argument("--sample-fps", type=float, default=SAMPLE_FPS, help="0 = every frame")
+    ap.add_argument("--start", help='"YYYY-MM-DD HH:MM:SS" of the first video (default: from file mtime)')
+    ap.add_argument("--log-dir", default=LOG_DIR)
+    ap.add_argument("--log-format", default=LOG_FORMAT, choices=["csv", "parquet", "both"])
+    args = ap.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S") if args.start else None
+    results = analyze_videos(args.videos, args.workers, args.chunk_sec, args.sample_fps,
+                             start, args.log_dir, args.log_format)
+    for r in results:
+        print(f"{r['path']}: {r['video_sec']}s of video in {r['wall_sec']}s "
+              f"({r['speedup']}x real time, {r['chunks']} chunks, {r['frames_analyzed']} frames) "
+              f"-> {r['rows']} rows from {r['first_row']}")
+    print(f"Logs in {args.log_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Compare phone-detector backends: startup time, per-frame latency and peak RSS.
+#
+# Usage: python benchmarks/bench_detector_backends.py path/to/frames_dir \
+#            [--backends ultralytics onnx opencv] [--imgsz 416]
+#
+# Each backend runs in its own subprocess so import cost and memory of one
+# (e.g. torch for ultralytics) does not leak into the numbers of another.
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+def peak_rss_mb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_single(args):
+    t0 = time.perf_counter()
+    import cv2
+    from phone_detector import create_phone_detector
+
+    detector = create_phone_detector(args.single, imgsz=args.imgsz, model_path=args.model_path)
+    paths = []
+    for ext in ("*.jpg", "*.jpeg", "*.png"):
+        paths.extend(glob.glob(os.path.join(args.frames_dir, ext)))
+    frames = [cv2.imread(p) for p in sorted(paths)]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        raise SystemExit("no frames in " + args.frames_dir)
+
+    detector(frames[0])  # first call includes lazy init / graph setup
+    startup = time.perf_counter() - t0
+
+    hits = 0
+    t0 = time.perf_counter()
+    for f in frames:
+        hits += bool(detector(f))
+    per_frame = (time.perf_counter() - t0) / len(frames)
+
+    print(json.dumps({
+        "backend": args.single,
+        "startup_sec": round(startup, 3),
+        "ms_per_frame": round(1000 * per_frame, 2),
+        "phone_frames": hits,
+        "frames": len(frames),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("frames_dir")
+    ap.add_argument("--backends", nargs="+", default=["ultralytics", "onnx", "opencv"])
+    ap.add_argument("--imgsz", type=int, default=416)
+    ap.add_argument("--model-path", default=None)
+    ap.add_argument("--single", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.single:
+        run_single(args)
+        return
+
+    print(f"{'backend':<13}{'startup s':>11}{'ms/frame':>10}{'RSS MB':>9}{'phone frames':>14}")
+    for backend in args.backends:
+        cmd = [sys.executable, os.path.abspath(__file__), args.frames_dir,
+               "--single", backend, "--imgsz", str(args.imgsz)]
+        if args.model_path:
+            cmd += ["--model-path", args.model_path]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            print(f"{backend:<13}failed: {err[-1] if err else proc.returncode}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{backend:<13}{r['startup_sec']:>11}{r['ms_per_frame']:>10}{r['peak_rss_mb']:>9}"
+              f"{str(r['phone_frames']) + '/' + str(r['frames']):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Focus-trend render time with and without downsampling, on a synthetic 24 h log.
+#
+# Usage: python benchmarks/bench_downsample.py [--rows 86400] [--repeat 3]
+#
+# Renders the dashboard chart (15x4 in) and the Today-PDF chart (6x3 in) to
+# PNG at dpi=200, once with every row and once per downsampling method.
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from downsample import downsample, target_points
+
+
+def synthetic_day(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2026-01-01", periods=rows, freq=pd.Timedelta(days=1) / rows)
+    # random walk clipped to the score range, with a few sharp phone dips
+    score = np.clip(np.cumsum(rng.normal(0, 1.5, rows)) + 60, 0, 100)
+    for start in rng.integers(0, rows - 200, 20):
+        score[start:start + 30] = 0
+    return ts.to_numpy(), score
+
+
+def render(x, y, figsize):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.plot(x, y, linewidth=2, color="#00FF99")
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    plt.close(fig)
+    return len(buf.getvalue())
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=86400)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    x, y = synthetic_day(args.rows)
+    charts = [("dashboard 15x4", (15, 4), target_points(15)),
+              ("pdf 6x3", (6, 3), target_points(6, dpi=200))]
+
+    print(f"{args.rows} rows")
+    print(f"{'chart':16s} {'mode':8s} {'points':>7s} {'thin ms':>8s} {'render ms':>10s} {'png KB':>7s}")
+    for name, size, n_out in charts:
+        full_sec, png = best_of(lambda: render(x, y, size), args.repeat)
+        print(f"{name:16s} {'full':8s} {len(y):7d} {0:8.1f} {full_sec * 1000:10.1f} {png / 1024:7.0f}")
+        for method in ("lttb", "minmax"):
+            thin_sec, (xs, ys) = best_of(lambda: downsample(x, y, n_out, method), args.repeat)
+            sec, png = best_of(lambda: render(xs, ys, size), args.repeat)
+            print(f"{name:16s} {method:8s} {len(ys):7d} {thin_sec * 1000:8.1f} {sec * 1000:10.1f} {png / 1024:7.0f}"
+                  f"   min/max kept: {ys.min():.0f}/{ys.max():.0f} of {y.min():.0f}/{y.max():.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Full-frame FaceMesh vs RoiFaceMesh on a recorded video.
+#
+# Usage: python benchmarks/bench_face_roi.py session.mp4 [--max-frames 900]
+#
+# Reports FaceMesh time per frame for both modes and how often the
+# screen / notebook / away pose class agrees with the full-frame run.
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import mediapipe as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_tracker import RoiFaceMesh
+from head_pose import head_pose_from_points, landmarks_to_array
+
+
+def new_face_mesh():
+    return mp.solutions.face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
+
+
+def classify(faces, shape):
+    if len(faces) != 1:
+        return "faces=%d" % len(faces)
+    return head_pose_from_points(faces[0], shape)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("video")
+    ap.add_argument("--max-frames", type=int, default=0)
+    ap.add_argument("--roi-size", type=int, default=256)
+    ap.add_argument("--max-side", type=int, default=640)
+    args = ap.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret or (args.max_frames and len(frames) >= args.max_frames):
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        print("No frames read from", args.video)
+        return
+    h, w = frames[0].shape[:2]
+
+    # baseline: what the monitors did before (fresh RGB copy, whole frame)
+    mesh = new_face_mesh()
+    base = []
+    t0 = time.perf_counter()
+    for f in frames:
+        result = mesh.process(cv2.cvtColor(f, cv2.COLOR_BGR2RGB))
+        faces = [landmarks_to_array(m.landmark, w, h) for m in (result.multi_face_landmarks or [])]
+        base.append(classify(faces, (h, w)))
+    base_sec = time.perf_counter() - t0
+
+    tracker = RoiFaceMesh(new_face_mesh(), new_face_mesh(), roi_size=args.roi_size, max_side=args.max_side)
+    roi = []
+    t0 = time.perf_counter()
+    for f in frames:
+        roi.append(classify(tracker.process(f), (h, w)))
+    roi_sec = time.perf_counter() - t0
+
+    agree = sum(1 for a, b in zip(base, roi) if a == b) / len(frames)
+    print(f"{len(frames)} frames at {w}x{h}")
+    print(f"  full frame : {1000 * base_sec / len(frames):7.2f} ms/frame")
+    print(f"  ROI        : {1000 * roi_sec / len(frames):7.2f} ms/frame   {tracker.stats()}")
+    print(f"  speedup    : {base_sec / roi_sec:.2f}x")
+    print(f"  pose-class agreement: {100 * agree:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Focus scoring: old per-frame int(rate * dt) rule vs focus_engine, and batch vs incremental.
+#
+# Usage: python benchmarks/bench_focus_engine.py [--hours 8]
+#
+# One synthetic session (focused / glancing / phone / no-face stretches of a
+# few seconds to a minute) is sampled at several frame rates. For each rate it
+# prints the mean score from the old rule and from the engine, and the time
+# to score the whole session with FocusEngine.update() and score_batch().
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from focus_engine import AWAY_THRESHOLD, FocusEngine, score_batch
+
+
+def session(hours, seed=0):
+    # (start_sec, faces, gaze, phone) segments
+    rng = np.random.default_rng(seed)
+    segs, t = [], 0.0
+    while t < hours * 3600:
+        kind = rng.choice(["screen", "notebook", "away", "phone", "no_face"], p=[.45, .2, .2, .1, .05])
+        segs.append((t, 0 if kind == "no_face" else 1, kind if kind in ("screen", "notebook") else "away",
+                     kind == "phone"))
+        t += rng.uniform(2, 60)
+    return segs
+
+
+def sample(segs, hours, fps):
+    starts = np.array([s[0] for s in segs])
+    t = np.arange(0, hours * 3600, 1.0 / fps)
+    j = np.searchsorted(starts, t, side="right") - 1
+    faces = np.array([s[1] for s in segs])[j]
+    gaze = np.array([s[2] for s in segs])[j]
+    phone = np.array([s[3] for s in segs])[j]
+    return t, faces, gaze, phone
+
+
+def old_rule(t, faces, gaze, phone):
+    # stream_server.py before focus_engine: integer step per frame
+    score, last_tick, away_start, total = 100, t[0], None, 0.0
+    for now, f, g, p in zip(t, faces, gaze, phone):
+        if g == "away":
+            away_start = now if away_start is None else away_start
+        else:
+            away_start = None
+        if f != 1:
+            rate = -15
+        elif p:
+            rate = -25
+        elif g in ("screen", "notebook"):
+            rate = 20
+        elif away_start is not None and now - away_start >= AWAY_THRESHOLD:
+            rate = -15
+        else:
+            rate = 5
+        dt = now - last_tick
+        last_tick = now
+        score = max(0, min(100, score + int(rate * dt)))
+        total += score
+    return total / len(t)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=8.0)
+    args = ap.parse_args()
+    segs = session(args.hours)
+
+    print(f"{args.hours:g} h session")
+    print(f"{'fps':>4s} {'frames':>9s} {'old mean':>9s} {'new mean':>9s} {'update() ms':>12s} {'batch ms':>9s} {'max diff':>9s}")
+    for fps in (5, 10, 30, 60):
+        t, faces, gaze, phone = sample(segs, args.hours, fps)
+        old = old_rule(t, faces, gaze, phone)
+
+        engine = FocusEngine()
+        inc = np.empty(len(t))
+        t0 = time.perf_counter()
+        for i in range(len(t)):
+            engine.update(t[i], faces[i], gaze[i], phone[i])
+            inc[i] = engine.score
+        ms_inc = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        _, scores = score_batch(t, faces, gaze, phone)
+        ms_batch = (time.perf_counter() - t0) * 1000
+        diff = np.abs(inc - scores).max()
+        print(f"{fps:4d} {len(t):9d} {old:9.1f} {scores.mean():9.1f} {ms_inc:12.0f} {ms_batch:9.1f} {diff:9.1e}")
+
+
+if __name__ == "__main__":
+    main()
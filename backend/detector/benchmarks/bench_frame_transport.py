@@ -0,0 +1,128 @@
+# Binary vs base64 frames for the Socket.IO "frame" event.
+#
+# Usage:
+#   python benchmarks/bench_frame_transport.py [--video session.mp4] [--frames 300]
+#   python benchmarks/bench_frame_transport.py --url http://localhost:6000 --clients 4 --seconds 10
+#
+# Offline mode compares bytes per frame and server-side decode time of the
+# old path (base64 -> PIL -> np.array -> RGB2BGR) with decode_frame() on raw
+# JPEG bytes. With --url it drives a running frontend/study_monitor.py with
+# python-socketio clients, once per payload type, and reports frames/s and
+# MB sent.
+import io
+import os
+import sys
+import time
+import base64
+import argparse
+import threading
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_codec import decode_frame
+
+
+def load_jpegs(video, count, size=(1280, 720), quality=80):
+    frames = []
+    cap = cv2.VideoCapture(video) if video else None
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    base = cv2.resize(base, size, interpolation=cv2.INTER_CUBIC)
+    for i in range(count):
+        if cap is not None:
+            ok, frame = cap.read()
+            if not ok:
+                break
+        else:
+            frame = np.roll(base, i * 4, axis=1)
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(buf.tobytes())
+    if cap is not None:
+        cap.release()
+    return frames
+
+
+def legacy_decode(data):
+    from PIL import Image
+    img = Image.open(io.BytesIO(base64.b64decode(data)))
+    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+
+
+def offline(frames):
+    b64 = [base64.b64encode(f).decode("ascii") for f in frames]
+    rows = [
+        ("base64 + PIL (old)", b64, legacy_decode),
+        ("base64 + imdecode", b64, decode_frame),
+        ("binary + imdecode", frames, decode_frame),
+    ]
+    print(f"{len(frames)} frames")
+    print(f"{'path':20s} {'KB/frame':>9s} {'ms/frame':>9s}")
+    for name, payloads, fn in rows:
+        fn(payloads[0])  # warm up
+        t0 = time.perf_counter()
+        for p in payloads:
+            fn(p)
+        ms = (time.perf_counter() - t0) * 1000 / len(payloads)
+        kb = sum(len(p) for p in payloads) / len(payloads) / 1024
+        print(f"{name:20s} {kb:9.1f} {ms:9.2f}")
+
+
+def drive(url, payloads, clients, seconds):
+    import socketio
+
+    sent = [0] * clients
+    answered = [0] * clients
+    nbytes = [0] * clients
+
+    def client(i):
+        sio = socketio.Client()
+        ready = threading.Event()
+        sio.on("analysis", lambda _: (answered.__setitem__(i, answered[i] + 1), ready.set()))
+        sio.connect(url, transports=["websocket"])
+        end = time.time() + seconds
+        k = 0
+        while time.time() < end:
+            p = payloads[k % len(payloads)]
+            ready.clear()
+            sio.emit("frame", p)
+            sent[i] += 1
+            nbytes[i] += len(p)
+            ready.wait(1.0)  # one frame in flight per client, like the browser
+            k += 1
+        sio.disconnect()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(answered) / seconds, sum(nbytes) / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--video")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--url")
+    ap.add_argument("--clients", type=int, default=1)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    frames = load_jpegs(args.video, args.frames)
+    if not frames:
+        print("No frames")
+        return
+    if not args.url:
+        offline(frames)
+        return
+
+    b64 = [base64.b64encode(f).decode("ascii") for f in frames]
+    for name, payloads in (("base64", b64), ("binary", frames)):
+        fps, mb = drive(args.url, payloads, args.clients, args.seconds)
+        print(f"{name:7s} {args.clients} client(s): {fps:6.1f} analyzed frames/s, {mb:7.1f} MB sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Per-frame HUD / landmark drawing cost: old putText path vs HudOverlay.
+#
+# Usage: python benchmarks/bench_overlay.py [--frames 500] [--size 1280x720] [--repeat 3]
+#
+# The HUD is drawn on a stream of frames where the focus score changes every
+# 10 frames and the status every 100 (roughly what a live session looks like
+# at 30 fps). Landmarks use a synthetic 478-point face (a random walk, so
+# neighbouring indices are a few pixels apart); without mediapipe the edge
+# sets are neighbour pairs of the same size as FACE_OVAL / CONTOURS.
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from overlay import FONT, HudOverlay, draw_landmarks, landmark_edges
+
+HINT = "[Q] Quit   [S] Sound On/Off   [R] Reset Score"
+STATUSES = [("Focused (screen)", (0, 255, 0)), ("Focused (temporary glance away)", (0, 255, 255)),
+            ("Not Focused (Phone Detected)", (0, 0, 255))]
+EDGE_COUNTS = {"oval": 36, "contours": 124}  # sizes of the mediapipe sets
+
+
+def direct_hud(frame, status, color, focus_score):
+    # what study_monitor.py / stream_server.py did every frame before
+    cv2.putText(frame, status, (30, 50), FONT, 1.0, color, 3)
+    cv2.putText(frame, f"Focus Score: {focus_score}/100", (30, 90), FONT, 0.9, (255, 255, 255), 2)
+    cv2.rectangle(frame, (30, 110), (330, 130), (200, 200, 200), 2)
+    cv2.rectangle(frame, (30, 110), (30 + int(300 * (focus_score / 100.0)), 130), (0, 255, 0), -1)
+    cv2.putText(frame, HINT, (30, 150), FONT, 0.6, (255, 255, 255), 1)
+
+
+def old_landmarks(frame, points, connections):
+    # previous face_tracker.draw_landmark_edges: one small array per edge
+    pts = points[:, :2].astype(np.int32)
+    lines = [pts[[i, j]] for i, j in connections]
+    cv2.polylines(frame, lines, False, (192, 192, 192), 1, cv2.LINE_AA)
+
+
+def edges_for(mode, rng):
+    try:
+        return landmark_edges(mode)
+    except ImportError:
+        starts = rng.choice(477, EDGE_COUNTS[mode], replace=False)
+        return np.column_stack([starts, starts + 1])
+
+
+def timed(base, n, fn, repeat):
+    # best of `repeat` runs, us per frame; draws cycle over a few frame buffers
+    best = None
+    for _ in range(repeat):
+        work = [f.copy() for f in base]
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(i, work[i % len(work)])
+        us = (time.perf_counter() - t0) * 1e6 / n
+        best = us if best is None else min(best, us)
+    return best
+
+
+def max_diff(base, n, state):
+    # old and new HUD drawn on the same frames must look the same
+    hud = HudOverlay(hint=HINT)
+    worst = 0
+    for i in range(n):
+        a, b = base[i % len(base)].copy(), base[i % len(base)].copy()
+        direct_hud(a, *state(i))
+        hud.draw(b, *state(i))
+        worst = max(worst, int(np.abs(a.astype(np.int16) - b).max()))
+    return worst
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=500)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.split("x"))
+
+    rng = np.random.default_rng(0)
+    base = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(8)]
+    n, repeat = args.frames, args.repeat
+
+    def state(i):
+        status, color = STATUSES[i // 100 % len(STATUSES)]
+        return status, color, 100 - (i // 10) % 101
+
+    hud = HudOverlay(hint=HINT)
+    us_direct = timed(base, n, lambda i, f: direct_hud(f, *state(i)), repeat)
+    us_hud = timed(base, n, lambda i, f: hud.draw(f, *state(i)), repeat)
+    diff = max_diff(base, min(n, 300), state)
+    print(f"HUD on {w}x{h}, {n} frames ({hud.stats()['renders'] // repeat} band renders per run)")
+    print(f"  putText every frame   {us_direct:8.1f} us/frame")
+    print(f"  HudOverlay            {us_hud:8.1f} us/frame   ({us_direct / us_hud:.1f}x, max pixel diff {diff})")
+
+    # one face, pixel coordinates
+    steps = rng.normal(0, 4, (478, 2))
+    points = np.column_stack([np.cumsum(steps, axis=0) + (w / 2, h / 2), rng.uniform(-50, 50, 478)])
+    print("Landmarks (478 points)")
+    for mode in ("contours", "oval"):
+        edges = edges_for(mode, rng)
+        connections = [tuple(e) for e in edges]
+        us_old = timed(base, n, lambda i, f: old_landmarks(f, points, connections), repeat)
+        us_new = timed(base, n, lambda i, f: draw_landmarks(f, points, mode, edges), repeat)
+        print(f"  {mode:8s} per-edge list {us_old:8.1f} us   edge array {us_new:8.1f} us   ({len(edges)} edges)")
+    for mode in ("pose", "off"):
+        us = timed(base, n, lambda i, f: draw_landmarks(f, points, mode), repeat)
+        print(f"  {mode:8s} {us:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Latency / recall of the phone-only detector at several input sizes.
+#
+# Usage: python benchmarks/bench_phone_detector.py path/to/frames_dir [--sizes 320 416 640]
+#
+# The reference is the original all-class pass at the model's native size.
+# Recall = share of reference phone frames the mode also flags; "extra" counts
+# frames the mode flags that the reference did not.
+import os
+import sys
+import glob
+import time
+import argparse
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from phone_detector import PhoneDetector
+
+
+def load_frames(folder):
+    paths = []
+    for ext in ("*.jpg", "*.jpeg", "*.png", "*.bmp"):
+        paths.extend(glob.glob(os.path.join(folder, ext)))
+    frames = [cv2.imread(p) for p in sorted(paths)]
+    return [f for f in frames if f is not None]
+
+
+def time_detector(detector, frames, warmup=3):
+    for f in frames[:warmup]:
+        detector(f)
+    flags = []
+    t0 = time.perf_counter()
+    for f in frames:
+        flags.append(bool(detector(f)))
+    return (time.perf_counter() - t0) / len(frames), flags
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("frames_dir")
+    ap.add_argument("--model", default="yolov8n.pt")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[320, 416, 640])
+    args = ap.parse_args()
+
+    frames = load_frames(args.frames_dir)
+    if not frames:
+        print("No frames found in", args.frames_dir)
+        return
+
+    from ultralytics import YOLO
+    yolo_model = YOLO(args.model)
+
+    ref_sec, ref = time_detector(PhoneDetector(yolo_model, mode="full"), frames)
+    positives = sum(ref)
+    print(f"{len(frames)} frames, {positives} with a phone (reference)")
+    print(f"{'mode':<14}{'ms/frame':>10}{'speedup':>10}{'recall':>10}{'extra':>8}")
+    print(f"{'full':<14}{1000 * ref_sec:>10.2f}{1.0:>10.2f}{'-':>10}{'-':>8}")
+
+    for size in args.sizes:
+        det = PhoneDetector(yolo_model, mode="phone", imgsz=size)
+        sec, flags = time_detector(det, frames)
+        hits = sum(1 for r, f in zip(ref, flags) if r and f)
+        extra = sum(1 for r, f in zip(ref, flags) if f and not r)
+        recall = f"{100 * hits / positives:.1f}%" if positives else "-"
+        print(f"{'phone@' + str(size):<14}{1000 * sec:>10.2f}{ref_sec / sec:>10.2f}{recall:>10}{extra:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Compare per-frame YOLO phone detection against the adaptive PhoneScheduler.
+#
+# Usage: python benchmarks/bench_phone_schedule.py clip1.mp4 [clip2.mp4 ...]
+#
+# The per-frame run is the reference. A "phone event" is a run of consecutive
+# reference frames with a phone; it counts as recalled if the scheduler flags
+# a phone on at least one frame of that run.
+import os
+import sys
+import time
+import argparse
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from phone_detector import PhoneScheduler, detect_phones
+
+
+def phone_events(flags):
+    events = []
+    start = None
+    for i, f in enumerate(flags):
+        if f and start is None:
+            start = i
+        elif not f and start is not None:
+            events.append((start, i))
+            start = None
+    if start is not None:
+        events.append((start, len(flags)))
+    return events
+
+
+def run_clip(path, yolo_model, args):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        print(f"{path}: no frames")
+        return None
+
+    # reference: YOLO on every frame
+    t0 = time.perf_counter()
+    ref = [bool(detect_phones(yolo_model, f)) for f in frames]
+    ref_sec = time.perf_counter() - t0
+
+    sched = PhoneScheduler(
+        lambda f: detect_phones(yolo_model, f),
+        idle_every_n=args.every_n,
+        active_every_n=args.every_n_active,
+        motion_threshold=args.motion,
+        use_tracker=not args.no_tracker,
+    )
+    t0 = time.perf_counter()
+    got = [sched.update(f)[0] for f in frames]
+    sched_sec = time.perf_counter() - t0
+
+    events = phone_events(ref)
+    recalled = sum(1 for s, e in events if any(got[s:e]))
+    agree = sum(1 for a, b in zip(ref, got) if a == b) / len(frames)
+
+    print(f"\n{os.path.basename(path)}  ({len(frames)} frames)")
+    print(f"  per-frame : {1000 * ref_sec / len(frames):7.2f} ms/frame")
+    print(f"  scheduled : {1000 * sched_sec / len(frames):7.2f} ms/frame   {sched.stats()}")
+    print(f"  saving    : {100 * (1 - sched_sec / ref_sec):6.1f}%")
+    print(f"  events    : {recalled}/{len(events)} recalled   frame agreement {100 * agree:.1f}%")
+    return ref_sec, sched_sec, recalled, len(events)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("clips", nargs="+")
+    ap.add_argument("--model", default="yolov8n.pt")
+    ap.add_argument("--every-n", type=int, default=10)
+    ap.add_argument("--every-n-active", type=int, default=2)
+    ap.add_argument("--motion", type=float, default=12.0)
+    ap.add_argument("--no-tracker", action="store_true")
+    args = ap.parse_args()
+
+    from ultralytics import YOLO
+    yolo_model = YOLO(args.model)
+
+    totals = [0.0, 0.0, 0, 0]
+    for clip in args.clips:
+        res = run_clip(clip, yolo_model, args)
+        if res:
+            totals = [a + b for a, b in zip(totals, res)]
+
+    if totals[0]:
+        print(f"\nTOTAL saving {100 * (1 - totals[1] / totals[0]):.1f}%, "
+              f"events recalled {totals[2]}/{totals[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Many concurrent subscribers against a running stream server.
+#
+# Usage:
+#   python benchmarks/load_test_stream.py --url http://localhost:5001 \
+#       --events 300 --video 20 --poll 0 --seconds 20
+#
+# --events  clients on /events (SSE; async server only)
+# --ws      clients on /ws (async server only)
+# --video   clients reading /video_feed
+# --poll    clients polling /analysis every --poll-interval seconds (old dashboards)
+# Works against both stream_server.py and stream_server_async.py, so the
+# two can be compared with the same numbers.
+import time
+import asyncio
+import argparse
+
+import aiohttp
+
+
+class Counter:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.errors = 0
+        self.connected = 0
+
+
+async def sse_client(session, url, seconds, c):
+    try:
+        async with session.get(url + "/events") as resp:
+            resp.raise_for_status()
+            c.connected += 1
+            end = time.monotonic() + seconds
+            async for line in resp.content:
+                if line.startswith(b"data:"):
+                    c.messages += 1
+                    c.bytes += len(line)
+                if time.monotonic() >= end:
+                    break
+    except Exception:
+        c.errors += 1
+
+
+async def ws_client(session, url, seconds, c):
+    try:
+        async with session.ws_connect(url + "/ws") as ws:
+            c.connected += 1
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                try:
+                    msg = await ws.receive(timeout=max(0.1, end - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    c.messages += 1
+                    c.bytes += len(msg.data)
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+    except Exception:
+        c.errors += 1
+
+
+async def video_client(session, url, seconds, c):
+    try:
+        async with session.get(url + "/video_feed") as resp:
+            resp.raise_for_status()
+            c.connected += 1
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                chunk = await resp.content.read(65536)
+                if not chunk:
+                    break
+                c.bytes += len(chunk)
+                c.messages += chunk.count(b"--frame")
+    except Exception:
+        c.errors += 1
+
+
+async def poll_client(session, url, seconds, interval, c):
+    end = time.monotonic() + seconds
+    c.connected += 1
+    while time.monotonic() < end:
+        try:
+            async with session.get(url + "/analysis") as resp:
+                body = await resp.read()
+                c.messages += 1
+                c.bytes += len(body)
+        except Exception:
+            c.errors += 1
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    kinds = {
+        "events": (args.events, lambda s, c: sse_client(s, args.url, args.seconds, c)),
+        "ws": (args.ws, lambda s, c: ws_client(s, args.url, args.seconds, c)),
+        "video": (args.video, lambda s, c: video_client(s, args.url, args.seconds, c)),
+        "poll": (args.poll, lambda s, c: poll_client(s, args.url, args.seconds, args.poll_interval, c)),
+    }
+    counters = {k: Counter() for k in kinds}
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = []
+        for kind, (n, make) in kinds.items():
+            tasks += [make(session, counters[kind]) for _ in range(n)]
+        t0 = time.monotonic()
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - t0
+
+        async with session.get(args.url + "/pipeline_stats") as resp:
+            stats = await resp.json(content_type=None)
+
+    print(f"{'kind':6s} {'clients':>7s} {'connected':>9s} {'errors':>6s} {'msg/s/client':>12s} {'MB':>8s}")
+    for kind, (n, _) in kinds.items():
+        if not n:
+            continue
+        c = counters[kind]
+        rate = c.messages / elapsed / max(c.connected, 1)
+        print(f"{kind:6s} {n:7d} {c.connected:9d} {c.errors:6d} {rate:12.1f} {c.bytes / 1e6:8.1f}")
+    if stats.get("running"):
+        fps = {name: st.get("fps") for name, st in stats.get("stages", {}).items()}
+        print(f"pipeline: stage fps {fps}, latency {stats.get('latency_ms')} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:5001")
+    ap.add_argument("--events", type=int, default=100)
+    ap.add_argument("--ws", type=int, default=0)
+    ap.add_argument("--video", type=int, default=10)
+    ap.add_argument("--poll", type=int, default=0)
+    ap.add_argument("--poll-interval", type=float, default=0.5)
+    ap.add_argument("--seconds", type=float, default=15.0)
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import namedtuple
+
+# One encoded variant of the video: max width (0 = camera width), JPEG
+# quality and frame-rate cap (0 = every frame). Viewers asking for the same
+# (quantized) values share one encode.
+StreamParams = namedtuple("StreamParams", "max_width quality fps")
+DEFAULT_STREAM = StreamParams(0, 95, 0)  # what cv2.imencode did before
+
+
+def parse_stream_params(args):
+    """StreamParams from /video_feed query args: ?w=640&q=70&fps=10."""
+    def num(name, default, lo, hi):
+        try:
+            value = int(float(args.get(name, default)))
+        except (TypeError, ValueError):
+            value = default
+        return max(lo, min(hi, value))
+
+    width = num("w", 0, 0, 3840)
+    if width:
+        width = max(160, width // 32 * 32)
+    quality = num("q", DEFAULT_STREAM.quality, 10, 100) // 5 * 5
+    fps = num("fps", 0, 0, 60)
+    return StreamParams(width, quality, fps)
+
+
+# ----- Latest-value broadcast hub -----
+class FrameHub:
+    """Holds the newest encoded frames + analysis payload for any number of readers.
+
+    Publishing never blocks on readers: each subscriber remembers the last
+    sequence number it saw and simply jumps to the newest one, so a slow
+    client skips frames instead of holding everybody else back.
+
+    Viewers register the StreamParams they want (add_stream); the encoder
+    asks active_streams() which variants to produce, so nothing is encoded
+    while nobody is watching and each distinct variant is encoded once.
+    """
+
+    def __init__(self, initial_payload=None):
+        self._cond = threading.Condition()
+        self.seq = 0
+        self.captured_at = 0.0
+        self.frames = {}   # StreamParams -> (seq, jpeg) of its newest encode
+        self.payload = dict(initial_payload or {})
+        self.streams = {}  # StreamParams -> number of viewers
+        self.closed = False
+
+    # pipeline sink interface (same put/close shape as DropOldestQueue)
+    def put(self, item):
+        # jpegs: {StreamParams: bytes} (may be empty), or plain bytes for the default stream
+        captured_at, jpegs, payload = item
+        if not isinstance(jpegs, dict):
+            jpegs = {DEFAULT_STREAM: jpegs} if jpegs is not None else {}
+        with self._cond:
+            self.seq += 1
+            self.captured_at = captured_at
+            for params, jpeg in jpegs.items():
+                self.frames[params] = (self.seq, jpeg)
+            self.payload = payload
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self.closed = False
+
+    def latest_payload(self):
+        with self._cond:
+            return dict(self.payload)
+
+    # ----- viewers -----
+    def add_stream(self, params=DEFAULT_STREAM):
+        with self._cond:
+            self.streams[params] = self.streams.get(params, 0) + 1
+
+    def remove_stream(self, params=DEFAULT_STREAM):
+        with self._cond:
+            n = self.streams.get(params, 0) - 1
+            if n > 0:
+                self.streams[params] = n
+            else:
+                self.streams.pop(params, None)
+                self.frames.pop(params, None)
+
+    def frames_snapshot(self):
+        with self._cond:
+            return dict(self.frames)
+
+    def active_streams(self):
+        with self._cond:
+            return list(self.streams)
+
+    @property
+    def subscribers(self):
+        with self._cond:
+            return sum(self.streams.values())
+
+    def _seq_of(self, params):
+        if params is None:
+            return self.seq
+        return self.frames.get(params, (0, None))[0]
+
+    def wait_next(self, last_seq, timeout=1.0, params=None):
+        # returns (seq, jpeg, payload); seq == last_seq means nothing new yet.
+        # params=None follows every publish (analysis only), else that stream's encodes
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._seq_of(params) <= last_seq and not self.closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if params is None:
+                return self.seq, self.frames.get(DEFAULT_STREAM, (0, None))[1], self.payload
+            seq, jpeg = self.frames.get(params, (0, None))
+            return seq, jpeg, self.payload
+
+    def subscribe(self, params=DEFAULT_STREAM):
+        # generator of new jpeg frames of one stream variant for one client
+        self.add_stream(params)
+        with self._cond:
+            last_seq = self._seq_of(params)
+        try:
+            while True:
+                seq, jpeg, _ = self.wait_next(last_seq, params=params)
+                if seq <= last_seq:
+                    if self.closed:
+                        return
+                    continue
+                last_seq = seq
+                yield jpeg
+        finally:
+            self.remove_stream(params)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "seq": self.seq,
+                "subscribers": sum(self.streams.values()),
+                "streams": {
+                    f"w={p.max_width or 'full'} q={p.quality} fps={p.fps or 'max'}": n
+                    for p, n in self.streams.items()
+                },
+                "age_ms": round(1000.0 * (time.time() - self.captured_at), 1) if self.captured_at else None,
+            }
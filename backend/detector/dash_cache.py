@@ -0,0 +1,98 @@
+# Small cache for the Streamlit dashboard.
+#
+# Streamlit re-executes dashboard.py on every widget interaction, but imported
+# modules stay loaded, so caches kept here survive reruns (and are shared by
+# all sessions of the same server). Keys include a file fingerprint (path,
+# mtime, size), so an entry is invalidated as soon as the log file behind it
+# changes; LRU size bounds and a TTL keep memory in check.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from focus_store import source_files
+
+
+def file_fingerprint(paths):
+    fp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        fp.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(fp)
+
+
+def day_fingerprint(log_dir, date):
+    return file_fingerprint(source_files(log_dir, date))
+
+
+class FingerprintCache:
+    def __init__(self, name, max_entries=32, ttl_sec=600.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_sec:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            self._evict(now)
+        return value
+
+    def _evict(self, now):
+        for key in [k for k, (t, _) in self._entries.items() if now - t >= self.ttl_sec]:
+            del self._entries[key]
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(name, max_entries=32, ttl_sec=600.0):
+    """Process-wide named cache (created on first use, reused on every rerun)."""
+    with _CACHES_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None:
+            cache = _CACHES[name] = FingerprintCache(name, max_entries, ttl_sec)
+        return cache
+
+
+def all_cache_stats():
+    with _CACHES_LOCK:
+        return {name: cache.stats() for name, cache in _CACHES.items()}
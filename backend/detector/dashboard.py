@@ -3,12 +3,16 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime
-import glob
+import io
 import matplotlib.pyplot as plt
 
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-import requests
+
+from focus_store import available_dates, csv_path, focused_mask, load_day
+from summary_index import day_summaries, index_path, refresh_index
+from dash_cache import all_cache_stats, day_fingerprint, file_fingerprint, get_cache
+from live_tail import get_tail
+from downsample import CHART_DPI, downsample, target_points
+from report_jobs import get_job_queue
 
 
 # =========================
@@ -16,6 +20,8 @@ import requests
 # =========================
 LOG_DIR = "focus_logs"
 BACKEND_UPLOAD_URL = "http://localhost:6000/api/reports/upload"
+LIVE_REFRESH_SEC = 5  # live mode: how often today's overview re-reads the log tail
+TREND_DOWNSAMPLE = "lttb"  # "lttb" or "minmax"; focus trend is thinned to ~1 point per pixel
 
 st.set_page_config(
     page_title="Study Focus Dashboard",
@@ -110,130 +116,217 @@ def create_focus_chart(df):
     return fig
 
 
-def upload_pdf_to_backend(pdf_path, title="Study Focus Report"):
-    try:
-        with open(pdf_path, "rb") as f:
-            files = {
-                "pdf": ("report.pdf", f, "application/pdf")
-            }
-            data = {
-                "title": title
-            }
-
-            res = requests.post(
-                BACKEND_UPLOAD_URL,
-                files=files,
-                data=data
-            )
-
-        return res.status_code == 200
-
-    except Exception as e:
-        st.error(f"Backend upload failed: {e}")
-        return False
-
-
-
-
-
-def available_dates():
-    if not os.path.exists(LOG_DIR):
-        return []
-    files = sorted(glob.glob(os.path.join(LOG_DIR, "*.csv")))
-    dates = [os.path.splitext(os.path.basename(f))[0] for f in files]
-    return dates
-
-def generate_weekly_report():
-    history = []
-    for file in glob.glob(os.path.join(LOG_DIR, "*.csv")):
-        dfh = pd.read_csv(file)
-        date_str = os.path.basename(file).replace(".csv", "")
-        total = len(dfh)
-        focused = dfh["status"].str.startswith("Focused").sum()
-        focus_pct = (focused / total * 100) if total else 0
-        avg_score = dfh["focus_score"].mean() if total else 0
-        phone_events = dfh["phone_detected"].sum()
-        history.append([date_str, round(focus_pct, 2), round(avg_score, 2), int(phone_events)])
-
-    if not history:
-        return None
-
-    week_df = pd.DataFrame(history, columns=["Date", "Focus %", "Avg Score", "Phone Events"])
-    week_df = week_df.sort_values("Date")
-
-    pdf_path = "Weekly_Study_Report.pdf"
-    c = canvas.Canvas(pdf_path, pagesize=A4)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(50, 800, "📅 Weekly Study Focus Report")
-    c.setFont("Helvetica", 12)
-    c.drawString(50, 770, "Date        Focus%       AvgScore       PhoneDetections")
-    y = 750
-    for _, row in week_df.iterrows():
-        c.drawString(50, y, f"{row['Date']}     {row['Focus %']}%           {row['Avg Score']}               {row['Phone Events']}")
-        y -= 20
-    c.save()
-    return pdf_path
-
-def generate_monthly_report():
-    history = []
-    for file in glob.glob(os.path.join(LOG_DIR, "*.csv")):
-        dfh = pd.read_csv(file)
-        date_str = os.path.basename(file).replace(".csv", "")
-        try:
-            file_date = datetime.strptime(date_str, "%Y-%m-%d")
-        except:
-            continue
-        if file_date.month != datetime.now().month or file_date.year != datetime.now().year:
-            continue
-
-        total = len(dfh)
-        focused = dfh["status"].str.startswith("Focused").sum()
-        focus_pct = (focused / total * 100) if total else 0
-        avg_score = dfh["focus_score"].mean() if total else 0
-        phone_events = dfh["phone_detected"].sum()
-        history.append([date_str, round(focus_pct, 2), round(avg_score, 2), int(phone_events)])
-
-    if not history:
-        return None
-
-    month_df = pd.DataFrame(history, columns=["Date", "Focus %", "Avg Score", "Phone Events"])
-    month_df = month_df.sort_values("Date")
-
-    pdf_path = "Monthly_Study_Report.pdf"
-    c = canvas.Canvas(pdf_path, pagesize=A4)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(50, 800, "📅 Monthly Study Focus Report")
-    c.setFont("Helvetica", 12)
-    c.drawString(50, 770, "Date        Focus%       AvgScore       PhoneDetections")
-    y = 750
-    for _, row in month_df.iterrows():
-        c.drawString(50, y, f"{row['Date']}     {row['Focus %']}%           {row['Avg Score']}               {row['Phone Events']}")
-        y -= 20
-    c.save()
-    return pdf_path
+# ----- report jobs -----
+# PDFs are built (and uploaded) by a background worker; the page only keeps
+# the job ids and polls their state, so a slow backend never blocks a rerun.
+report_jobs = get_job_queue(LOG_DIR, BACKEND_UPLOAD_URL)
+JOB_FINISHED = ("done", "spooled", "failed")
+
+
+def report_job_panel(kind, label, no_data_msg):
+    job_id = st.session_state.get("report_jobs", {}).get(kind)
+    job = report_jobs.status(job_id) if job_id else None
+    if job is None:
+        return
+    if job["state"] not in JOB_FINISHED:
+        st.info(f"⏳ {label} report: {job['state']}...")
+        return
+    if job["state"] == "failed":
+        st.warning(no_data_msg if job["error"] == "no data" else f"⚠️ {job['error']}")
+        if job["pdf"] is None:
+            return
+    elif job["upload"]:
+        if job["state"] == "done":
+            st.success("✅ PDF saved & visible in Analytics")
+        else:
+            st.warning("⚠️ PDF created but backend upload failed - it will be retried in the background")
+    st.download_button(
+        label=f"⬇️ Download {label}",
+        data=job["pdf"],
+        file_name=f"{label}_Study_Report.pdf",
+        mime="application/pdf",
+        key=f"download_{job_id}",
+    )
+
+
+def submit_report(kind, **kwargs):
+    st.session_state.setdefault("report_jobs", {})[kind] = report_jobs.submit(kind, **kwargs)
+
+
+# =========================
+# Cached data & figures
+# =========================
+# Streamlit reruns this whole script on every click. Day data, aggregates and
+# rendered charts are kept in process-wide caches keyed on the fingerprint
+# (path, mtime, size) of the files behind them, so only a file that actually
+# changed - usually today's log - is re-read and re-drawn.
+data_cache = get_cache("data", max_entries=16, ttl_sec=600)
+figure_cache = get_cache("figures", max_entries=32, ttl_sec=600)
+
+
+def load_day_cached(date, fp):
+    def compute():
+        day = load_day(LOG_DIR, date)
+        return day.dropna(subset=["timestamp"]).sort_values("timestamp")
+    return data_cache.get(("day", date, fp), compute)
+
+
+def day_kpis(df, date, fp):
+    def compute():
+        total = len(df)
+        focused = int(focused_mask(df["status"]).sum()) if total else 0
+        counts = df["status"].value_counts().reset_index()
+        counts.columns = ["status", "count"]
+        return {
+            "total_rows": total,
+            "focus_pct": (focused / total * 100) if total else 0,
+            "avg_score": float(df["focus_score"].mean()) if total else 0,
+            "status_counts": counts,
+        }
+    return data_cache.get(("kpis", date, fp), compute)
+
+
+def summaries_cached():
+    # refresh first (cheap stat calls), then the index file itself is the key
+    refresh_index(LOG_DIR)
+    fp = file_fingerprint([index_path(LOG_DIR)])
+    return data_cache.get(("summaries", fp), lambda: day_summaries(LOG_DIR, refresh=False)), fp
+
+
+def render_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=CHART_DPI, bbox_inches="tight", facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def cached_chart(key, build):
+    """PNG bytes of build()'s figure, drawn once per key."""
+    return figure_cache.get(key, lambda: render_png(build()))
+
+
+def status_bar_figure(status_counts):
+    fig, ax = plt.subplots(figsize=(18, 6))
+    ax.bar(status_counts["status"], status_counts["count"], color="#05917C")
+    ax.set_facecolor("#111111")
+    fig.patch.set_facecolor("#111111")
+    ax.set_xlabel("Status", color="white")
+    ax.set_ylabel("Count", color="white")
+    ax.set_title("Status Breakdown Chart", color="white")
+    ax.tick_params(axis="x", colors="white", rotation=45)
+    ax.tick_params(axis="y", colors="white")
+    return fig
+
+
+def focus_trend_figure(df):
+    fig, ax = plt.subplots(figsize=(15, 4))
+    ax.set_facecolor("#111111")
+    fig.patch.set_facecolor("#111111")
+    x, y = downsample(df["timestamp"], df["focus_score"], target_points(15, dpi=CHART_DPI), TREND_DOWNSAMPLE)
+    ax.plot(x, y, linewidth=2, color="#00FF99")
+    ax.set_xlabel("Time", color="white")
+    ax.set_ylabel("Focus Score", color="white")
+    ax.set_title("Focus Score Trend", color="white")
+    ax.tick_params(axis="x", colors="white", rotation=45)
+    ax.tick_params(axis="y", colors="white")
+    return fig
+
+
+def pie_figure(pie_data):
+    fig, ax = plt.subplots(figsize=(4, 4))
+    ax.set_facecolor("#000000")
+    fig.patch.set_facecolor("#000000")
+    colors = ["#06BC7F", "#FFB347", "#8A2BE2", "#FF6B6B"]
+    ax.pie(
+        pie_data,
+        labels=pie_data.index,
+        autopct="%1.1f%%",
+        startangle=120,
+        colors=colors,
+        textprops={'color': "white", 'fontsize': 11}
+    )
+    return fig
+
+
+def history_figure(history_df):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.set_facecolor("#111111")
+    fig.patch.set_facecolor("#111111")
+    ax.plot(history_df["Date"], history_df["Focus %"], marker="o", linewidth=2, color="#00FFAA")
+    ax.set_xlabel("Date", color="white")
+    ax.set_ylabel("Focus %", color="white")
+    ax.set_title("Focus Improvement Over Days", color="white")
+    ax.tick_params(axis="x", colors="white", rotation=45)
+    ax.tick_params(axis="y", colors="white")
+    return fig
 
 # =========================
 # Load Data (Date selector in sidebar)
 # =========================
 st.sidebar.header("Filters")
-dates = available_dates()
+dates = available_dates(LOG_DIR)
 if not dates:
     st.warning("No CSV file exists. First run `study_monitor.py`")
     st.stop()
 
 selected_date = st.sidebar.selectbox("Select Date", dates, index=len(dates)-1)
-csv_path = os.path.join(LOG_DIR, selected_date + ".csv")
-df = pd.read_csv(csv_path)
+day_fp = day_fingerprint(LOG_DIR, selected_date)
+
+# Live mode: today's CSV is followed from the last byte read instead of reloaded
+live_path = csv_path(LOG_DIR, selected_date)
+live_mode = (
+    selected_date == datetime.now().strftime("%Y-%m-%d")
+    and os.path.exists(live_path)
+    and st.sidebar.checkbox("🔴 Live mode (today)", value=True)
+)
 
-# Parse & sort
-df["timestamp"] = pd.to_datetime(df["timestamp"], errors='coerce')
-df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
+if live_mode:
+    tail = get_tail(live_path)
+    tail.poll()
+    df = tail.frame()
+    kpis = dict(tail.kpis(), status_counts=tail.status_counts())
+else:
+    df = load_day_cached(selected_date, day_fp)
+    kpis = day_kpis(df, selected_date, day_fp)
 
 # KPIs common
-total_rows = len(df)
-focused_rows = df["status"].str.startswith("Focused").sum()
-focus_pct = (focused_rows / total_rows * 100) if total_rows else 0
-avg_score = df["focus_score"].mean() if total_rows else 0
+total_rows = kpis["total_rows"]
+focus_pct = kpis["focus_pct"]
+avg_score = kpis["avg_score"]
+
+# ----- live overview (re-runs on its own timer when st.fragment exists) -----
+live_cache = get_cache("live", max_entries=4, ttl_sec=60)
+
+
+def live_overview():
+    tail.poll()
+    live = tail.kpis()
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Total Records", f"{live['total_rows']}")
+    k2.metric("Time Focused (%)", f"{live['focus_pct']:.1f}%")
+    k3.metric("Average Focus Score", f"{live['avg_score']:.1f}")
+
+    st.subheader("Status Breakdown (Table)")
+    counts = tail.status_counts()
+    st.dataframe(counts, use_container_width=True)
+
+    # charts are only redrawn when the tail actually moved
+    st.subheader("Status Breakdown (Chart)")
+    st.image(live_cache.get(("status_bar", live_path, tail.offset),
+                            lambda: render_png(status_bar_figure(counts))), use_container_width=True)
+
+    st.subheader("Focus Score Over Time")
+    ts, scores = tail.trend()
+    trend_df = pd.DataFrame({"timestamp": ts, "focus_score": scores})
+    st.image(live_cache.get(("focus_trend", live_path, tail.offset),
+                            lambda: render_png(focus_trend_figure(trend_df))), use_container_width=True)
+
+    st.caption(f"🔴 Live - last update {datetime.now().strftime('%H:%M:%S')}")
+
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+if _fragment is not None:
+    live_overview = _fragment(run_every=LIVE_REFRESH_SEC)(live_overview)
 
 # =========================
 # NAVBAR (Tabs)
@@ -252,59 +345,36 @@ tabs = st.tabs([
 # 1) Overview
 # -------------------------
 with tabs[0]:
-    k1, k2, k3 = st.columns(3)
-    k1.metric("Total Records", f"{total_rows}")
-    k2.metric("Time Focused (%)", f"{focus_pct:.1f}%")
-    k3.metric("Average Focus Score", f"{avg_score:.1f}")
+    if live_mode:
+        live_overview()
+        if _fragment is None:
+            st.button("🔄 Refresh")  # old Streamlit: no timer, a click reruns
+    else:
+        k1, k2, k3 = st.columns(3)
+        k1.metric("Total Records", f"{total_rows}")
+        k2.metric("Time Focused (%)", f"{focus_pct:.1f}%")
+        k3.metric("Average Focus Score", f"{avg_score:.1f}")
 
-    st.subheader("Status Breakdown (Table)")
-    status_counts = df["status"].value_counts().reset_index()
-    status_counts.columns = ["status", "count"]
-    st.dataframe(status_counts, use_container_width=True)
+        st.subheader("Status Breakdown (Table)")
+        status_counts = kpis["status_counts"]
+        st.dataframe(status_counts, use_container_width=True)
 
-    st.subheader("Status Breakdown (Chart)")
-    fig1, ax = plt.subplots(figsize=(18, 6))
-    ax.bar(status_counts["status"], status_counts["count"], color="#05917C")
-    ax.set_facecolor("#111111")
-    fig1.patch.set_facecolor("#111111")
-    ax.set_xlabel("Status", color="white")
-    ax.set_ylabel("Count", color="white")
-    ax.set_title("Status Breakdown Chart", color="white")
-    ax.tick_params(axis="x", colors="white", rotation=45)
-    ax.tick_params(axis="y", colors="white")
-    st.pyplot(fig1)
+        st.subheader("Status Breakdown (Chart)")
+        st.image(cached_chart(("status_bar", selected_date, day_fp),
+                              lambda: status_bar_figure(status_counts)), use_container_width=True)
 
-    st.subheader("Focus Score Over Time")
-    fig2, ax = plt.subplots(figsize=(15, 4))
-    ax.set_facecolor("#111111")
-    fig2.patch.set_facecolor("#111111")
-    ax.plot(df["timestamp"], df["focus_score"], linewidth=2, color="#00FF99")
-    ax.set_xlabel("Time", color="white")
-    ax.set_ylabel("Focus Score", color="white")
-    ax.set_title("Focus Score Trend", color="white")
-    ax.tick_params(axis="x", colors="white", rotation=45)
-    ax.tick_params(axis="y", colors="white")
-    st.pyplot(fig2)
+        st.subheader("Focus Score Over Time")
+        st.image(cached_chart(("focus_trend", selected_date, day_fp),
+                              lambda: focus_trend_figure(df)), use_container_width=True)
 
 # -------------------------
 # 2) Distraction Breakdown (Pie, dark)
 # -------------------------
 with tabs[1]:
     st.subheader("📈 Distraction Breakdown")
-    pie_data = df["status"].value_counts()
-    fig_pie, ax = plt.subplots(figsize=(4, 4))
-    ax.set_facecolor("#000000")
-    fig_pie.patch.set_facecolor("#000000")
-    colors = ["#06BC7F", "#FFB347", "#8A2BE2", "#FF6B6B"]
-    ax.pie(
-        pie_data,
-        labels=pie_data.index,
-        autopct="%1.1f%%",
-        startangle=120,
-        colors=colors,
-        textprops={'color': "white", 'fontsize': 11}
-    )
-    st.pyplot(fig_pie)
+    pie_data = kpis["status_counts"].set_index("status")["count"]
+    st.image(cached_chart(("pie", selected_date, day_fp),
+                          lambda: pie_figure(pie_data)), use_container_width=True)
 
     
 
@@ -313,7 +383,7 @@ with tabs[1]:
 # -------------------------
 with tabs[2]:
     st.subheader("📱 Phone Detection Timeline")
-    phone_df = df[df["phone_detected"] == 1]
+    phone_df = df[df["phone_detected"]]
     if phone_df.empty:
         st.info("No phone events logged.")
     else:
@@ -326,33 +396,16 @@ with tabs[3]:
     st.subheader("📅 Export Reports")
     col1, col2, col3 = st.columns(3)
 
+    if st.session_state.get("report_jobs") is None:
+        st.session_state["report_jobs"] = {}
+
     with col1:
         if st.button("🗂️ Weekly PDF"):
-            pdf_file = generate_weekly_report()
-            if pdf_file:
-                with open(pdf_file, "rb") as f:
-                    st.download_button(
-                        label="⬇️ Download Weekly",
-                        data=f,
-                        file_name="Weekly_Study_Report.pdf",
-                        mime="application/pdf"
-                    )
-            else:
-                st.warning("No weekly data found.")
+            submit_report("weekly")
 
     with col2:
         if st.button("🗓️ Monthly PDF"):
-            pdf_file = generate_monthly_report()
-            if pdf_file:
-                with open(pdf_file, "rb") as f:
-                    st.download_button(
-                        label="⬇️ Download Monthly",
-                        data=f,
-                        file_name="Monthly_Study_Report.pdf",
-                        mime="application/pdf"
-                    )
-            else:
-                st.warning("No data for this month.")
+            submit_report("monthly")
 
     # with col3:
     #     if st.button("📄 Today PDF"):
@@ -383,84 +436,50 @@ with tabs[3]:
     #                 mime="application/pdf"
     #             )
     with col3:
-     if st.button("📄 Today PDF"):
-        pdf_path = "dashboard_report.pdf"
-        c = canvas.Canvas(pdf_path, pagesize=A4)
-
-        # ---------- TEXT ----------
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(50, 820, "Study Focus Dashboard Report")
-
-        c.setFont("Helvetica", 12)
-        c.drawString(50, 790, f"Date: {selected_date}")
-        c.drawString(50, 770, f"Time Focused: {focus_pct:.1f}%")
-        c.drawString(50, 750, f"Average Focus Score: {avg_score:.1f}")
-
-        # ---------- STATUS CHART (NEW FIG) ----------
-        status_chart_path = "status_chart.png"
-        fig_status, ax1 = plt.subplots(figsize=(6, 3))
-        status_counts = df["status"].value_counts()
-        ax1.bar(status_counts.index, status_counts.values, color="#05917C")
-        ax1.set_title("Status Breakdown")
-        plt.xticks(rotation=45)
-        fig_status.savefig(status_chart_path, dpi=200, bbox_inches="tight")
-        plt.close(fig_status)
-
-        # ---------- FOCUS CHART (NEW FIG) ----------
-        focus_chart_path = "focus_chart.png"
-        fig_focus, ax2 = plt.subplots(figsize=(6, 3))
-        ax2.plot(df["timestamp"], df["focus_score"], color="#00FF99")
-        ax2.set_title("Focus Score Trend")
-        fig_focus.savefig(focus_chart_path, dpi=200, bbox_inches="tight")
-        plt.close(fig_focus)
-
-        # ---------- DRAW INTO PDF ----------
-        c.drawImage(status_chart_path, 50, 430, width=500, height=250)
-        c.drawImage(focus_chart_path, 50, 150, width=500, height=250)
-
-        c.save()
-
-        # ---------- BACKEND UPLOAD ----------
-        uploaded = upload_pdf_to_backend(
-            pdf_path,
-            title=f"Study Report - {selected_date}"
+        if st.button("📄 Today PDF"):
+            submit_report("day", title=f"Study Report - {selected_date}", upload=True,
+                          date=selected_date, method=TREND_DOWNSAMPLE)
+
+    def jobs_pending():
+        return any(
+            (report_jobs.status(job_id) or {}).get("state") not in JOB_FINISHED + (None,)
+            for job_id in st.session_state["report_jobs"].values()
         )
 
-        if uploaded:
-            st.success("✅ PDF saved & visible in Analytics")
-        else:
-            st.warning("⚠️ PDF created but backend upload failed")
-
-        with open(pdf_path, "rb") as f:
-            st.download_button(
-                "⬇️ Download Today",
-                f,
-                file_name="Today_Study_Report.pdf",
-                mime="application/pdf"
-            )
+    def report_status(polling=False):
+        # own columns: a fragment may only draw into its own container
+        cols = st.columns(3)
+        for col, (kind, label, no_data_msg) in zip(cols, (
+                ("weekly", "Weekly", "No weekly data found."),
+                ("monthly", "Monthly", "No data for this month."),
+                ("day", "Today", "No data for this day."))):
+            with col:
+                report_job_panel(kind, label, no_data_msg)
+        if polling and not jobs_pending():
+            # all done: a full rerun registers the fragment again without the timer
+            st.rerun()
+
+    pending = jobs_pending()
+    if _fragment is not None:
+        # poll once a second while something is still being built / uploaded
+        _fragment(run_every=1 if pending else None)(report_status)(polling=pending)
+    else:
+        report_status()
+        if pending:
+            st.button("🔄 Refresh status")
 
 # ---------- TAB 5 (MERGED COMPARISON) ----------
 with tabs[4]:
 
     st.subheader("📆 Weekly Comparison (This Week vs Last Week)")
 
-    df_all = []
-    for file in glob.glob(os.path.join(LOG_DIR, "*.csv")):
-        date_str = os.path.basename(file).replace(".csv", "")
-        try:
-            d = pd.to_datetime(date_str)
-        except:
-            continue
-        
-        dfh = pd.read_csv(file)
-        total = len(dfh)
-        focused = dfh["status"].str.startswith("Focused").sum()
-        pct = (focused / total * 100) if total else 0
-
-        df_all.append([d, pct])
-
-    if df_all:
-        week_df = pd.DataFrame(df_all, columns=["Date", "Focus"])
+    summary, summary_fp = summaries_cached()
+    week_df = pd.DataFrame({
+        "Date": pd.to_datetime(summary["Date"], errors="coerce"),
+        "Focus": summary["Focus %"],
+    }).dropna(subset=["Date"])
+
+    if not week_df.empty:
         week_df["Week"] = week_df["Date"].dt.isocalendar().week
 
         latest_week = week_df["Week"].max()
@@ -492,10 +511,9 @@ with tabs[4]:
     st.subheader("🔄 Compare Two Days")
     d1 = st.selectbox("Select First Day", dates)
     d2 = st.selectbox("Select Second Day", dates)
-    df1=pd.read_csv(os.path.join(LOG_DIR,d1+".csv"))
-    df2=pd.read_csv(os.path.join(LOG_DIR,d2+".csv"))
-    f1=(df1["status"].str.startswith("Focused").sum()/len(df1)*100)
-    f2=(df2["status"].str.startswith("Focused").sum()/len(df2)*100)
+    day_pct = summary.set_index("Date")["Focus %"]
+    f1=day_pct.get(d1, 0.0)
+    f2=day_pct.get(d2, 0.0)
     c1,c2=st.columns(2)
     c1.metric(d1,f"{f1:.1f}%"); c2.metric(d2,f"{f2:.1f}%")
 
@@ -504,27 +522,12 @@ with tabs[4]:
 # -------------------------
 with tabs[5]:
     st.subheader("📊 Focus Percentage Trend (History)")
-    history = []
-    for file in glob.glob(os.path.join(LOG_DIR, "*.csv")):
-        dfh = pd.read_csv(file)
-        date_str = os.path.basename(file).replace(".csv", "")
-        total = len(dfh)
-        focused = dfh["status"].str.startswith("Focused").sum()
-        focus_pct_h = (focused / total * 100) if total else 0
-        history.append([date_str, focus_pct_h])
-
-    if history:
-        history_df = pd.DataFrame(history, columns=["Date", "Focus %"]).sort_values("Date")
-        fig3, ax = plt.subplots(figsize=(10, 4))
-        ax.set_facecolor("#111111")
-        fig3.patch.set_facecolor("#111111")
-        ax.plot(history_df["Date"], history_df["Focus %"], marker="o", linewidth=2, color="#00FFAA")
-        ax.set_xlabel("Date", color="white")
-        ax.set_ylabel("Focus %", color="white")
-        ax.set_title("Focus Improvement Over Days", color="white")
-        ax.tick_params(axis="x", colors="white", rotation=45)
-        ax.tick_params(axis="y", colors="white")
-        st.pyplot(fig3)
+    # index was refreshed by the Comparison tab a moment ago in this same run
+    history_df = summary[["Date", "Focus %"]]
+
+    if not history_df.empty:
+        st.image(cached_chart(("history", summary_fp),
+                              lambda: history_figure(history_df)), use_container_width=True)
         st.dataframe(history_df, use_container_width=True)
     else:
         st.info("No history found.")
@@ -534,4 +537,12 @@ with tabs[5]:
 # -------------------------
 with tabs[6]:
     st.subheader("🗂️ Raw Log Data")
-    st.dataframe(df, use_container_width=True)
\ No newline at end of file
+    st.dataframe(df, use_container_width=True)
+
+# =========================
+# Cache counters (sidebar)
+# =========================
+with st.sidebar.expander("⚡ Cache"):
+    for name, stats in all_cache_stats().items():
+        st.write(f"**{name}**: {stats['hits']} hits / {stats['misses']} misses "
+                 f"({stats['hit_rate'] * 100:.0f}%), {stats['entries']} entries")
@@ -0,0 +1,21 @@
+# Detector tuning shared by every entry point: stream_server.py,
+# study_monitor.py, batch_analyzer.py and frontend/study_monitor.py import
+# these, so a phone / face / motion setting is changed in one place.
+import os
+
+# ===== Phone detector =====
+PHONE_DETECT_EVERY_N = 10        # YOLO cadence while no phone is visible
+PHONE_DETECT_EVERY_N_ACTIVE = 2  # ...and while one is
+PHONE_MOTION_THRESHOLD = 12.0    # mean gray diff that forces an early YOLO run
+PHONE_DETECTOR_MODE = "phone"    # "phone" = phone class only, "full" = all 80 classes
+PHONE_DETECTOR_IMGSZ = 416       # YOLO input size in "phone" mode (320 / 416 / 640)
+PHONE_DETECTOR_BACKEND = os.environ.get("PHONE_DETECTOR_BACKEND", "ultralytics")  # ultralytics / onnx / opencv
+
+# ===== Face tracking =====
+FACE_ROI_MARGIN = 0.35           # crop around the last face, as a share of its size
+FACE_MAX_SIDE = 640              # full-frame FaceMesh input is downscaled to this
+FACE_FULL_FRAME_EVERY = 15       # re-scan the whole frame every N frames for new faces
+
+# ===== Motion gate =====
+MOTION_GATE_THRESHOLD = 4.0      # mean gray diff below which the last result is reused
+MOTION_GATE_MAX_STALE_SEC = 2.0  # ...but never reuse a result older than this
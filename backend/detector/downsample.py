@@ -0,0 +1,81 @@
+# Reduce a long time series to about as many points as the chart has pixels.
+#
+# A day log has tens of thousands of rows but a 15" chart is ~1500 px wide,
+# so matplotlib spends most of its time drawing segments nobody can see.
+# Both methods keep the points that carry the visual shape:
+#   "lttb"   - Largest-Triangle-Three-Buckets, one point per bucket chosen to
+#              keep the area (peaks / dips) of the line
+#   "minmax" - the min and max of every bucket, exact envelope of the line
+# Inputs shorter than the target are returned unchanged.
+import numpy as np
+
+CHART_DPI = 200  # dpi the dashboard and PDF charts are saved at; size targets with it
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the n_out points LTTB keeps (first and last always included)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # bucket edges for the n - 2 inner points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third triangle corner
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx = x[nlo:nhi].mean()
+        cy = y[nlo:nhi].mean()
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_buckets):
+    """Indices of the min and max of each of n_buckets equal buckets, in time order."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_buckets * 2 >= n or n_buckets < 1:
+        return np.arange(n)
+    size = -(-n // n_buckets)  # ceil
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    buckets = buckets[valid]
+    starts = np.flatnonzero(valid) * size
+    lo = starts + np.nanargmin(buckets, axis=1)
+    hi = starts + np.nanargmax(buckets, axis=1)
+    return np.unique(np.concatenate([lo, hi]))
+
+
+def target_points(width_in, dpi=100):
+    """One point per horizontal pixel of a width_in-inch figure."""
+    return max(int(width_in * dpi), 3)
+
+
+def downsample(x, y, n_out, method="lttb"):
+    """(x, y) thinned to about n_out points; works with pandas Series or arrays."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if method == "minmax":
+        idx = minmax_indices(y, n_out // 2)
+    else:
+        idx = lttb_indices(x, y, n_out)
+    return x[idx], y[idx]
@@ -0,0 +1,139 @@
+import cv2
+import numpy as np
+
+
+# ----- Region-of-interest FaceMesh -----
+class RoiFaceMesh:
+    """Runs FaceMesh on a crop around the last known face instead of the whole frame.
+
+    The crop is a square around the previous landmarks plus `margin`, resized
+    to a fixed `roi_size`, so one BGR and one RGB buffer are reused every
+    frame. Full-frame detection (downscaled to `max_side`) only runs when
+    there is no face to follow, when tracking is lost, or every
+    `full_frame_every` frames so a second person walking in is still noticed.
+
+    Crops and full frames are different coordinate frames, and a video-mode
+    FaceMesh (static_image_mode=False) carries the last face rect from one
+    call to the next, so crops go to their own `roi_face_mesh`. Passing the
+    same instance for both is only fine when it is static_image_mode=True.
+
+    process() returns a list of (N, 3) landmark arrays in full-frame pixels.
+    """
+
+    def __init__(self, face_mesh, roi_face_mesh=None, margin=0.35, roi_size=256, max_side=640,
+                 full_frame_every=15):
+        self.face_mesh = face_mesh
+        self.roi_face_mesh = roi_face_mesh or face_mesh
+        self.margin = margin
+        self.roi_size = roi_size
+        self.max_side = max_side
+        self.full_frame_every = full_frame_every
+
+        self.bbox = None  # x0, y0, x1, y1 of the last single face
+        self._since_full = 0
+        self._roi_bgr = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self._roi_rgb = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self._full_bufs = {}
+
+        self.full_frame_runs = 0
+        self.roi_runs = 0
+        self.lost = 0
+        self.full_misses = 0
+
+    def _full_buffers(self, h, w):
+        scale = min(1.0, self.max_side / float(max(h, w)))
+        size = (int(round(w * scale)), int(round(h * scale)))
+        bufs = self._full_bufs.get((h, w))
+        if bufs is None:
+            small = None if scale == 1.0 else np.empty((size[1], size[0], 3), dtype=np.uint8)
+            rgb = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            bufs = self._full_bufs[(h, w)] = (size, small, rgb)
+        return bufs
+
+    def _run_full(self, frame):
+        self.full_frame_runs += 1
+        self._since_full = 0
+        h, w = frame.shape[:2]
+        size, small, rgb = self._full_buffers(h, w)
+        src = frame
+        if small is not None:
+            cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+            src = small
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=rgb)
+        result = self.face_mesh.process(rgb)
+        # normalized coords do not care about the downscale
+        return self._to_pixels(result, 0, 0, w, h)
+
+    def _roi_box(self, h, w):
+        x0, y0, x1, y1 = self.bbox
+        side = max(x1 - x0, y1 - y0) * (1 + 2 * self.margin)
+        side = int(min(max(side, 64), h, w))
+        cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+        rx = int(np.clip(cx - side / 2.0, 0, w - side))
+        ry = int(np.clip(cy - side / 2.0, 0, h - side))
+        return rx, ry, side
+
+    def _run_roi(self, frame):
+        self.roi_runs += 1
+        h, w = frame.shape[:2]
+        rx, ry, side = self._roi_box(h, w)
+        crop = frame[ry:ry + side, rx:rx + side]
+        cv2.resize(crop, (self.roi_size, self.roi_size), dst=self._roi_bgr, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._roi_bgr, cv2.COLOR_BGR2RGB, dst=self._roi_rgb)
+        result = self.roi_face_mesh.process(self._roi_rgb)
+        return self._to_pixels(result, rx, ry, side, side)
+
+    @staticmethod
+    def _to_pixels(result, ox, oy, sw, sh):
+        faces = []
+        for face in result.multi_face_landmarks or []:
+            pts = np.array([(p.x, p.y, p.z) for p in face.landmark], dtype=np.float32)
+            pts[:, 0] = ox + pts[:, 0] * sw
+            pts[:, 1] = oy + pts[:, 1] * sh
+            # z shares the scale of x in the processed region
+            pts[:, 2] *= sw
+            faces.append(pts)
+        return faces
+
+    def _update_bbox(self, faces, h, w):
+        if len(faces) != 1:
+            self.bbox = None
+            return
+        pts = faces[0]
+        x0, y0 = np.maximum(pts[:, :2].min(axis=0), 0)
+        x1, y1 = np.minimum(pts[:, :2].max(axis=0), (w - 1, h - 1))
+        self.bbox = (float(x0), float(y0), float(x1), float(y1))
+
+    def process(self, frame):
+        h, w = frame.shape[:2]
+        self._since_full += 1
+        if self.bbox is None or self._since_full >= self.full_frame_every:
+            faces = self._run_full(frame)
+            if not faces and self.bbox is not None:
+                # periodic re-scan missed the face (it is downscaled there): try the
+                # last ROI before reporting "no face" for a frame
+                self.full_misses += 1
+                faces = self._run_roi(frame)
+        else:
+            faces = self._run_roi(frame)
+            if not faces:
+                # tracking lost: retry this same frame on the whole image
+                self.lost += 1
+                faces = self._run_full(frame)
+        self._update_bbox(faces, h, w)
+        return faces
+
+    def stats(self):
+        return {
+            "full_frame_runs": self.full_frame_runs,
+            "roi_runs": self.roi_runs,
+            "lost": self.lost,
+            "full_misses": self.full_misses,
+        }
+
+
+def draw_landmark_edges(frame, points, edges, color=(192, 192, 192)):
+    # cheap replacement for mp_drawing.draw_landmarks when we already have pixel arrays.
+    # edges: (E, 2) index array (overlay.landmark_edges); one fancy-index gives all
+    # segments, so only the edge endpoints get converted
+    cv2.polylines(frame, points[edges, :2].astype(np.int32), False, color, 1, cv2.LINE_AA)
@@ -0,0 +1,208 @@
+# Focus status + score rules, in one place.
+#
+# Input is a stream of observations (timestamp, faces_detected, gaze_status,
+# phone_detected); output is the status and the focus score after each one.
+# The score moves at SCORE_RATES points per *second* for the status that held
+# since the previous observation and is clamped to [FOCUS_MIN, FOCUS_MAX].
+# It is kept as a float, so a 60 FPS loop and a 5 FPS loop end up at the same
+# score for the same behaviour (the old int(rate * dt) rounded every step
+# to 0 at high frame rates).
+#
+# FocusEngine.update() is the incremental form used by the live loops;
+# score_batch() replays whole arrays with NumPy (re-scoring logs / videos
+# with other rates). Both give the same scores up to float rounding.
+import numpy as np
+
+# ===== Settings =====
+FOCUS_MAX = 100
+FOCUS_MIN = 0
+START_SCORE = 100
+AWAY_THRESHOLD = 10.0   # seconds of "away" gaze before a glance counts as looking away
+MAX_GAP_SEC = 5.0       # longer gaps between observations (paused, reconnect) count as this
+# points per second while in each status (keys as in focus_log.STATUS_KEYS)
+SCORE_RATES = {
+    "screen": 20.0,
+    "notebook": 20.0,
+    "glance": 5.0,
+    "no_face": -15.0,
+    "phone": -25.0,
+    "away": -15.0,
+}
+# ===========================
+
+# status codes, in focus_log.STATUS_KEYS order
+SCREEN, NOTEBOOK, GLANCE, NO_FACE, PHONE, AWAY = range(6)
+STATUS_NAMES = ["screen", "notebook", "glance", "no_face", "phone", "away"]
+STATUS_LABELS = [
+    "Focused (screen)",
+    "Focused (notebook)",
+    "Focused (temporary glance away)",
+    "Not Focused (Multiple/No Face)",
+    "Not Focused (Phone Detected)",
+    "Not Focused (Looking Away >10s)",
+]
+STATUS_COLORS = [  # BGR for the HUD
+    (0, 255, 0), (0, 255, 0), (0, 255, 255),
+    (0, 0, 255), (0, 0, 255), (0, 0, 255),
+]
+
+
+def is_focused(code):
+    return code in (SCREEN, NOTEBOOK, GLANCE)
+
+
+def rate_table(rates=None):
+    """Per-status-code rates as an array; `rates` overrides some of SCORE_RATES."""
+    merged = dict(SCORE_RATES)
+    merged.update(rates or {})
+    return np.array([merged[name] for name in STATUS_NAMES], dtype=np.float64)
+
+
+def classify(faces_detected, gaze_status, phone_detected, away_long_enough):
+    if faces_detected != 1:
+        return NO_FACE
+    if phone_detected:
+        return PHONE
+    if gaze_status == "screen":
+        return SCREEN
+    if gaze_status == "notebook":
+        return NOTEBOOK
+    if away_long_enough:
+        return AWAY
+    return GLANCE
+
+
+# ----- Incremental (live) -----
+class FocusEngine:
+    """Per-session scoring state; feed it one observation per analyzed frame."""
+
+    def __init__(self, rates=None, away_threshold=AWAY_THRESHOLD, max_gap=MAX_GAP_SEC,
+                 start_score=START_SCORE):
+        self.rates = rate_table(rates)
+        self.away_threshold = away_threshold
+        self.max_gap = max_gap
+        self.start_score = start_score
+        self.reset()
+
+    def reset(self):
+        self.score = float(self.start_score)
+        self.code = None          # status of the previous observation
+        self.last_t = None
+        self.look_away_start = None
+
+    @property
+    def focus_score(self):
+        return int(round(self.score))
+
+    def update(self, t, faces_detected, gaze_status, phone_detected):
+        """One observation at time t (seconds) -> (status code, rounded score)."""
+        if gaze_status == "away":
+            if self.look_away_start is None:
+                self.look_away_start = t
+        else:
+            self.look_away_start = None
+        away_long_enough = self.look_away_start is not None and t - self.look_away_start >= self.away_threshold
+
+        if self.code is not None:
+            dt = min(max(t - self.last_t, 0.0), self.max_gap)
+            # the previous status held until now
+            self.score = min(FOCUS_MAX, max(FOCUS_MIN, self.score + self.rates[self.code] * dt))
+        self.code = classify(faces_detected, gaze_status, phone_detected, away_long_enough)
+        self.last_t = t
+        return self.code, self.focus_score
+
+
+# ----- Batch (replay) -----
+def _clamped_cumsum(start, steps, lo, hi):
+    """s[i] = clip(s[i-1] + steps[i], lo, hi), s[-1] = start, without a Python loop per step.
+
+    With only the upper bound the recursion has a closed form through the
+    running max of the prefix sums (and the lower bound through the running
+    min). So: run with one bound until the value crosses the other one, fix
+    that element at the bound, switch, repeat. Windows grow geometrically, so
+    long stretches between crossings cost a few NumPy calls.
+    """
+    n = len(steps)
+    out = np.empty(n, dtype=np.float64)
+    k = 0
+    s = float(start)
+    window = 256
+    while k < n:
+        seg = np.cumsum(steps[k:k + window])
+        if s >= (lo + hi) / 2:
+            vals = s + seg - np.maximum(0.0, np.maximum.accumulate(seg) - (hi - s))
+            crossed = np.flatnonzero(vals < lo)
+            bound = lo
+        else:
+            vals = s + seg - np.minimum(0.0, np.minimum.accumulate(seg) - (lo - s))
+            crossed = np.flatnonzero(vals > hi)
+            bound = hi
+        if len(crossed):
+            i = crossed[0]
+            out[k:k + i] = vals[:i]
+            out[k + i] = bound
+            s = bound
+            k += i + 1
+            window = 256
+        else:
+            out[k:k + len(vals)] = vals
+            s = vals[-1]
+            k += len(vals)
+            window *= 2
+    return np.clip(out, lo, hi, out=out)  # closed form can overshoot by float rounding
+
+
+def away_flags(t, gaze_away, away_threshold=AWAY_THRESHOLD):
+    """True where gaze has been "away" for at least away_threshold seconds."""
+    n = len(t)
+    idx = np.arange(n)
+    run_start = gaze_away & np.concatenate([[True], ~gaze_away[:-1]])
+    first = np.maximum.accumulate(np.where(run_start, idx, 0))
+    return gaze_away & (t - t[first] >= away_threshold)
+
+
+def score_batch(t, faces_detected, gaze_status, phone_detected, rates=None,
+                away_threshold=AWAY_THRESHOLD, max_gap=MAX_GAP_SEC, start_score=START_SCORE):
+    """Vectorized FocusEngine over whole arrays -> (status codes, float scores).
+
+    t in seconds (sorted); gaze_status is an array of "screen" / "notebook" /
+    "away" strings. Same rules and results as feeding FocusEngine.update()
+    one observation at a time.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    n = len(t)
+    if n == 0:
+        return np.empty(0, dtype=np.int8), np.empty(0, dtype=np.float64)
+    faces = np.asarray(faces_detected)
+    gaze = np.asarray(gaze_status).astype(str)
+    phone = np.asarray(phone_detected).astype(bool)
+
+    away_long = away_flags(t, gaze == "away", away_threshold)
+    codes = np.select(
+        [faces != 1, phone, gaze == "screen", gaze == "notebook", away_long],
+        [NO_FACE, PHONE, SCREEN, NOTEBOOK, AWAY],
+        GLANCE,
+    ).astype(np.int8)
+
+    dt = np.clip(np.diff(t), 0.0, max_gap)
+    steps = np.empty(n, dtype=np.float64)
+    steps[0] = 0.0
+    steps[1:] = rate_table(rates)[codes[:-1]] * dt
+    return codes, _clamped_cumsum(start_score, steps, FOCUS_MIN, FOCUS_MAX)
+
+
+def rescore_log(df, rates=None, **kwargs):
+    """Re-run the rules over a focus log DataFrame (one row per interval).
+
+    Returns a copy with status / focus_score recomputed. Logged rows hold the
+    dominant gaze of each interval, so this is an approximation of the live
+    per-frame run; good for comparing rate settings.
+    """
+    import pandas as pd
+    t = (pd.to_datetime(df["timestamp"]) - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+    codes, scores = score_batch(t, df["faces_detected"].to_numpy(), df["gaze_status"].to_numpy(),
+                                df["phone_detected"].to_numpy(), rates=rates, **kwargs)
+    out = df.copy()
+    out["status"] = np.array(STATUS_LABELS, dtype=object)[codes]
+    out["focus_score"] = np.round(scores, 1)
+    return out
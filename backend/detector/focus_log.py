@@ -0,0 +1,279 @@
+import atexit
+import csv
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+LOG_COLUMNS = [
+    "timestamp", "status", "gaze_status", "faces_detected",
+    "phone_detected", "focus_score",
+]
+
+# status text -> short key used for the per-interval time-share columns
+STATUS_KEYS = [
+    ("Focused (screen)", "screen"),
+    ("Focused (notebook)", "notebook"),
+    ("Focused (temporary glance", "glance"),
+    ("Not Focused (Multiple/No Face)", "no_face"),
+    ("Not Focused (Phone", "phone"),
+    ("Not Focused (Looking Away", "away"),
+]
+PCT_COLUMNS = ["pct_" + key for _, key in STATUS_KEYS]
+
+# columns written by the interval aggregator, on top of the legacy ones
+AGGREGATE_COLUMNS = LOG_COLUMNS + ["focused_pct"] + PCT_COLUMNS + ["phone_frames", "frames"]
+
+
+def status_key(status):
+    for prefix, key in STATUS_KEYS:
+        if status.startswith(prefix):
+            return key
+    return "away"
+
+
+# ----- Wall-clock interval aggregation -----
+class IntervalAggregator:
+    """Turns per-frame observations into one log row per `interval_sec` of wall time.
+
+    Each observation holds until the next one arrives, so the row's shares and
+    mean focus score are weighted by time, not by frame count: a 5 FPS and a
+    60 FPS loop produce the same rows for the same behaviour. Gaps longer than
+    one interval (e.g. the detector was paused) are capped so they don't
+    swamp the next row.
+    """
+
+    def __init__(self, interval_sec=1.0):
+        self.interval_sec = interval_sec
+        self._last = None  # (time, status, gaze, faces, phone, score)
+        self._reset(None)
+
+    def _reset(self, start):
+        self._start = start
+        self._status_sec = {}
+        self._gaze_sec = {}
+        self._score_sec = 0.0
+        self._total_sec = 0.0
+        self._phone_frames = 0
+        self._frames = 0
+
+    def add(self, now, status, gaze_status, faces_detected, phone_detected, focus_score):
+        """Feed one frame; returns a finished row dict when an interval closes, else None."""
+        if self._start is None:
+            self._start = now
+        self._hold_last(now)
+        self._frames += 1
+        self._phone_frames += int(bool(phone_detected))
+        self._last = (now, status, gaze_status, faces_detected, phone_detected, focus_score)
+
+        if now - self._start < self.interval_sec or self._total_sec <= 0:
+            return None
+        row = self._row(now)
+        self._reset(now)
+        return row
+
+    def finish(self, now=None):
+        """Closes the last, partial interval -> its row, or None if no frame is pending.
+
+        now: when the last observation stopped holding (e.g. end of the video);
+        by default its own time. The aggregator starts over afterwards.
+        """
+        if self._last is None:
+            return None
+        if now is None:
+            now = self._last[0]
+        self._hold_last(now)
+        row = self._row(now) if self._total_sec > 0 and self._frames else None
+        self._last = None
+        self._reset(None)
+        return row
+
+    def _hold_last(self, now):
+        # the previous observation held from its time until now
+        if self._last is None:
+            return
+        prev_t, prev_status, prev_gaze, _, _, prev_score = self._last
+        dt = min(max(now - prev_t, 0.0), self.interval_sec)
+        self._status_sec[prev_status] = self._status_sec.get(prev_status, 0.0) + dt
+        self._gaze_sec[prev_gaze] = self._gaze_sec.get(prev_gaze, 0.0) + dt
+        self._score_sec += prev_score * dt
+        self._total_sec += dt
+
+    def _row(self, now):
+        total = self._total_sec
+        faces_detected = self._last[3]
+        shares = {key: 0.0 for _, key in STATUS_KEYS}
+        for status, sec in self._status_sec.items():
+            shares[status_key(status)] += sec
+        row = {
+            "timestamp": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": max(self._status_sec, key=self._status_sec.get),
+            "gaze_status": max(self._gaze_sec, key=self._gaze_sec.get),
+            "faces_detected": faces_detected,
+            "phone_detected": int(self._phone_frames > 0),
+            "focus_score": round(self._score_sec / total, 1),
+            "focused_pct": round(100.0 * (shares["screen"] + shares["notebook"] + shares["glance"]) / total, 1),
+            "phone_frames": self._phone_frames,
+            "frames": self._frames,
+        }
+        for _, key in STATUS_KEYS:
+            row["pct_" + key] = round(100.0 * shares[key] / total, 1)
+        return row
+
+
+# ----- Background day-file writer -----
+class FocusLogWriter(threading.Thread):
+    """Appends focus-log rows from a queue on a background thread.
+
+    Rows are dicts. The frame loop only does a queue put. This thread keeps
+    today's CSV open, writes rows in batches (every `flush_interval` seconds
+    or `batch_size` rows, whichever comes first) and switches to a new file
+    when the row timestamps cross midnight. A day file that already exists
+    keeps its header; keys it has no column for are dropped. close() drains
+    the queue and flushes; it is registered with atexit and SIGTERM so
+    stopping the detector loses no rows.
+
+    log_format picks "csv", "parquet" (date-partitioned dataset, see
+    focus_store) or "both". "parquet" still writes the day CSV, so today's
+    rows are readable at once; finished days' CSVs are dropped once their
+    parts supersede them.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_dir="focus_logs", flush_interval=1.0, batch_size=50,
+                 columns=AGGREGATE_COLUMNS, log_format="csv"):
+        super().__init__(name="focus-log-writer", daemon=True)
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.columns = columns
+        self._parquet = None  # the day CSV is written in every mode
+        if log_format in ("parquet", "both"):
+            from focus_store import HAVE_ARROW, ParquetPartWriter
+            if HAVE_ARROW:
+                self._parquet = ParquetPartWriter(log_dir, drop_old_csv=log_format == "parquet")
+            else:
+                print("pyarrow not installed, focus logs stay CSV only")
+
+        self._queue = queue.Queue()
+        self._day = None
+        self._file = None
+        self._writer = None
+        self._closed = False
+
+        self.rows_written = 0
+        self.flushes = 0
+
+    # ----- called from the frame loop -----
+    def log(self, row):
+        self._queue.put(row)
+
+    # ----- writer thread -----
+    def _open_day(self, day):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = os.path.join(self.log_dir, day + ".csv")
+        columns = self.columns
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, newline="") as f:
+                header = next(csv.reader(f), None)
+            if header:
+                columns = header
+        self._file = open(path, "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+        if new_file:
+            self._writer.writeheader()
+        self._day = day
+
+    def _write_batch(self, batch):
+        if self._parquet is not None:
+            for row in batch:
+                self._parquet.add(row)
+            self._parquet.maybe_flush()
+        self._write_csv(batch)
+        self.rows_written += len(batch)
+        self.flushes += 1
+
+    def _write_csv(self, batch):
+        for row in batch:
+            # "YYYY-MM-DD HH:MM:SS" -> day file; rotation follows the row, not the wall clock
+            day = row["timestamp"][:10]
+            if day != self._day:
+                if self._file is not None:
+                    self._file.flush()
+                self._open_day(day)
+            self._writer.writerow(row)
+        if self._file is not None:
+            self._file.flush()
+
+    def run(self):
+        batch = []
+        last_flush = time.time()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.time() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            if item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.time() - last_flush >= self.flush_interval):
+                self._write_batch(batch)
+                batch = []
+            if time.time() - last_flush >= self.flush_interval:
+                last_flush = time.time()
+
+        # drain whatever arrived before the stop marker
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                batch.append(item)
+        if batch:
+            self._write_batch(batch)
+        if self._parquet is not None:
+            self._parquet.maybe_flush(force=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self):
+        return {
+            "pending": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+        }
+
+
+def start_log_writer(log_dir="focus_logs", **kwargs):
+    """Start a writer and make sure it is flushed on normal exit and on SIGTERM."""
+    writer = FocusLogWriter(log_dir, **kwargs)
+    writer.start()
+    atexit.register(writer.close)
+
+    # stopDetector kills the process with SIGTERM; turn it into a normal exit
+    # so atexit handlers (and the final flush) run
+    if threading.current_thread() is threading.main_thread():
+        try:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        except (ValueError, OSError):
+            pass
+    return writer
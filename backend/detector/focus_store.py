@@ -0,0 +1,251 @@
+# Columnar focus-log storage: a date-partitioned Parquet dataset next to the CSVs.
+#
+#   focus_logs/parquet/date=2026-01-28/part-1769621772.parquet
+#
+# status / gaze_status are dictionary-encoded, phone_detected is a bool, so
+# history queries read only the columns and days they need. Every reader
+# falls back to the day CSV when a day has no Parquet partition (or pyarrow
+# is not installed), and when the CSV was written after the newest part:
+# with FOCUS_LOG_FORMAT=csv the CSV keeps growing after a convert, and in
+# "both" mode parts are only flushed every few minutes, so the CSV is the
+# complete copy.
+#
+# FOCUS_LOG_FORMAT=parquet is for history: the current day is still written
+# to its CSV too (live mode tails it, and the dashboard / reports would not
+# see today's rows until the next part flush otherwise). Once a finished
+# day's parts are at least as new as its CSV - readers already ignore the CSV
+# then - the writer deletes the CSV on its next start.
+#
+# One-shot conversion of existing CSV history:
+#   python focus_store.py convert [--log-dir focus_logs] [--overwrite]
+import os
+import glob
+import time
+import argparse
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAVE_ARROW = True
+except ImportError:
+    pa = pq = None
+    HAVE_ARROW = False
+
+DATASET_NAME = "parquet"
+ACTIVE_CSV_SEC = 300.0  # convert leaves CSVs modified this recently alone (still being written)
+
+CATEGORY_COLUMNS = ["status", "gaze_status"]
+INT_COLUMNS = ["faces_detected", "phone_frames", "frames"]
+FLOAT_COLUMNS = ["focus_score", "focused_pct", "pct_screen", "pct_notebook", "pct_glance",
+                 "pct_no_face", "pct_phone", "pct_away"]
+
+
+def dataset_dir(log_dir):
+    return os.path.join(log_dir, DATASET_NAME)
+
+
+def partition_dir(log_dir, date):
+    return os.path.join(dataset_dir(log_dir), "date=" + date)
+
+
+def partition_files(log_dir, date):
+    return sorted(glob.glob(os.path.join(partition_dir(log_dir, date), "*.parquet")))
+
+
+def csv_path(log_dir, date):
+    return os.path.join(log_dir, date + ".csv")
+
+
+# ----- dtypes -----
+def normalize(df):
+    """Coerce a raw log frame to the dataset dtypes (in place where possible)."""
+    if "timestamp" in df.columns:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "phone_detected" in df.columns:
+        df["phone_detected"] = pd.to_numeric(df["phone_detected"], errors="coerce").fillna(0).astype(bool)
+    for col in INT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int32")
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+def focused_mask(status):
+    """status.str.startswith("Focused"), evaluated once per category instead of per row."""
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        hits = status.cat.categories.str.startswith("Focused")
+        return pd.Series(hits[status.cat.codes], index=status.index) & (status.cat.codes >= 0)
+    return status.astype(str).str.startswith("Focused")
+
+
+def _to_table(df):
+    df = normalize(df.copy())
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # pandas categoricals arrive as dictionary arrays already; make sure strings do too
+    fields = []
+    for field in table.schema:
+        if field.name in CATEGORY_COLUMNS and not pa.types.is_dictionary(field.type):
+            fields.append(pa.field(field.name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(field)
+    return table.cast(pa.schema(fields))
+
+
+def write_partition(log_dir, date, df, part_name=None):
+    if df.empty:
+        return None
+    os.makedirs(partition_dir(log_dir, date), exist_ok=True)
+    part_name = part_name or f"part-{time.time_ns()}.parquet"
+    path = os.path.join(partition_dir(log_dir, date), part_name)
+    tmp = path + ".tmp"
+    pq.write_table(_to_table(df), tmp, compression="zstd")
+    os.replace(tmp, path)  # readers never see a half-written part
+    return path
+
+
+def compact_partition(log_dir, date):
+    """Merge a day's part files into one (done for finished days)."""
+    parts = partition_files(log_dir, date)
+    if len(parts) <= 1:
+        return
+    df = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    df = df.sort_values("timestamp")
+    write_partition(log_dir, date, df, part_name=f"day-{date}.parquet")
+    for p in parts:
+        if os.path.basename(p) != f"day-{date}.parquet":
+            os.remove(p)
+
+
+# ----- readers -----
+def available_dates(log_dir):
+    dates = set()
+    for f in glob.glob(os.path.join(log_dir, "*.csv")):
+        dates.add(os.path.splitext(os.path.basename(f))[0])
+    for d in glob.glob(os.path.join(dataset_dir(log_dir), "date=*")):
+        if glob.glob(os.path.join(d, "*.parquet")):
+            dates.add(os.path.basename(d)[len("date="):])
+    return sorted(dates)
+
+
+def source_files(log_dir, date):
+    """Files backing one day: its Parquet parts, unless the CSV is missing them rows."""
+    path = csv_path(log_dir, date)
+    csv_files = [path] if os.path.exists(path) else []
+    if HAVE_ARROW:
+        parts = partition_files(log_dir, date)
+        if parts:
+            # CSV appended to after the last part was written -> it has rows the parts don't
+            if csv_files and os.path.getmtime(path) > max(os.path.getmtime(p) for p in parts):
+                return csv_files
+            return parts
+    return csv_files
+
+
+def load_day(log_dir, date, columns=None):
+    """One day's log as a normalized DataFrame, reading only `columns` when given."""
+    files = source_files(log_dir, date)
+    if not files:
+        return pd.DataFrame(columns=columns or [])
+    if files[0].endswith(".parquet"):
+        frames = []
+        for p in files:
+            have = pq.read_schema(p).names
+            cols = None if columns is None else [c for c in columns if c in have]
+            frames.append(pq.read_table(p, columns=cols).to_pandas())
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    else:
+        usecols = None if columns is None else (lambda c: c in columns)
+        df = pd.read_csv(files[0], usecols=usecols)
+    return normalize(df)
+
+
+def load_days(log_dir, dates, columns=None):
+    """{date: DataFrame} for several days."""
+    return {d: load_day(log_dir, d, columns) for d in dates}
+
+
+# ----- writer sink used by focus_log.FocusLogWriter -----
+class ParquetPartWriter:
+    """Buffers rows and writes them as one part file per `flush_sec` per day.
+
+    drop_old_csv: delete finished days' CSVs that the parts supersede
+    (FOCUS_LOG_FORMAT=parquet).
+    """
+
+    def __init__(self, log_dir, flush_sec=300.0, drop_old_csv=False):
+        if not HAVE_ARROW:
+            raise RuntimeError("pyarrow is required for Parquet focus logs")
+        self.log_dir = log_dir
+        self.flush_sec = flush_sec
+        self._rows = {}
+        self._last_flush = time.time()
+        # days before today are finished: fold their parts together
+        today = time.strftime("%Y-%m-%d")
+        for date in available_dates(log_dir):
+            if date >= today:
+                continue
+            # decided before compacting: the merged part is always newer than the CSV
+            superseded = source_files(log_dir, date)[:1] != [csv_path(log_dir, date)]
+            compact_partition(log_dir, date)
+            if drop_old_csv and superseded and os.path.exists(csv_path(log_dir, date)):
+                os.remove(csv_path(log_dir, date))
+
+    def add(self, row):
+        self._rows.setdefault(row["timestamp"][:10], []).append(row)
+
+    def maybe_flush(self, force=False):
+        if not self._rows:
+            return
+        if not force and time.time() - self._last_flush < self.flush_sec:
+            return
+        for date, rows in self._rows.items():
+            write_partition(self.log_dir, date, pd.DataFrame(rows))
+        self._rows = {}
+        self._last_flush = time.time()
+
+
+# ----- one-shot CSV -> Parquet conversion -----
+def convert_csv_history(log_dir, overwrite=False):
+    """Convert finished day CSVs; today's file and any still being written are skipped."""
+    converted = 0
+    today = time.strftime("%Y-%m-%d")
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.csv"))):
+        date = os.path.splitext(os.path.basename(path))[0]
+        if date >= today or time.time() - os.path.getmtime(path) < ACTIVE_CSV_SEC:
+            print(f"{date}: still being written, left as CSV")
+            continue
+        if partition_files(log_dir, date) and not overwrite:
+            continue
+        for old in partition_files(log_dir, date):
+            os.remove(old)
+        df = pd.read_csv(path)
+        if write_partition(log_dir, date, df, part_name=f"day-{date}.parquet"):
+            converted += 1
+            print(f"{date}: {len(df)} rows")
+    return converted
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Focus-log Parquet dataset tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="convert existing day CSVs to the Parquet dataset")
+    conv.add_argument("--log-dir", default="focus_logs")
+    conv.add_argument("--overwrite", action="store_true")
+    args = ap.parse_args()
+
+    if not HAVE_ARROW:
+        raise SystemExit("pyarrow is not installed (pip install pyarrow)")
+    if args.cmd == "convert":
+        n = convert_csv_history(args.log_dir, overwrite=args.overwrite)
+        print(f"Converted {n} day file(s) into {dataset_dir(args.log_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Decoding of browser frames sent over the Socket.IO "frame" event.
+#
+# New clients emit the JPEG bytes themselves (canvas.toBlob -> ArrayBuffer),
+# which Socket.IO ships as a binary attachment: no base64 inflation on the
+# wire and no decode step on the server. Old clients still send a base64
+# string (optionally a "data:image/jpeg;base64," URL); both end up in
+# cv2.imdecode, which writes straight into one BGR array.
+import base64
+import binascii
+
+import cv2
+import numpy as np
+
+
+def frame_bytes(data):
+    """The encoded image inside a frame event payload, as a bytes-like object."""
+    if isinstance(data, dict):  # {"image": ...} style payloads
+        data = data.get("image") or data.get("frame")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    if isinstance(data, str):
+        if data.startswith("data:"):
+            data = data.split(",", 1)[1]
+        try:
+            return base64.b64decode(data)
+        except (binascii.Error, ValueError):
+            return None
+    return None
+
+
+def decode_frame(data):
+    """BGR frame from a binary or base64 payload, or None if it can't be decoded."""
+    raw = frame_bytes(data)
+    if not raw:
+        return None
+    # frombuffer is a view on the received bytes, no copy before the decoder
+    return cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
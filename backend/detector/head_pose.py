@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+
+# FaceMesh landmark ids used for pose: nose tip, chin, outer eye corners, mouth corners
+POSE_LANDMARKS = [1, 152, 33, 263, 61, 291]
+
+# Canonical 3D face (mm) in camera-style axes: x right, y down, z away from the
+# camera, nose tip at the origin. Order matches POSE_LANDMARKS.
+FACE_MODEL_3D = np.array([
+    [0.0, 0.0, 0.0],        # nose tip
+    [0.0, 330.0, 65.0],     # chin
+    [-225.0, -170.0, 135.0],  # eye corner (image left)
+    [225.0, -170.0, 135.0],   # eye corner (image right)
+    [-150.0, 150.0, 125.0],   # mouth corner (image left)
+    [150.0, 150.0, 125.0],    # mouth corner (image right)
+], dtype=np.float64)
+
+# ========= Pose thresholds (degrees) =========
+YAW_LIMIT = 25.0        # |yaw| above this -> away
+SCREEN_PITCH = 15.0     # |pitch| within this -> screen
+NOTEBOOK_PITCH = 45.0   # looking down up to this -> notebook
+# =============================================
+
+
+def landmarks_to_array(landmarks, w, h):
+    """MediaPipe landmark list -> (N, 3) float32 array in pixels, in one pass."""
+    pts = np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+    pts *= np.array([w, h, w], dtype=np.float32)
+    return pts
+
+
+def camera_matrix(w, h):
+    # no calibration available: focal length ~ image width, principal point at centre
+    return np.array([[w, 0, w / 2.0], [0, w, h / 2.0], [0, 0, 1]], dtype=np.float64)
+
+
+_NO_DISTORTION = np.zeros((4, 1))
+
+
+def estimate_pose(points, w, h, cam=None):
+    """(N, 2+) landmark pixels -> (yaw, pitch, roll) in degrees via solvePnP.
+
+    Positive yaw = head turned to image right, positive pitch = looking down.
+    """
+    image_pts = np.ascontiguousarray(points[POSE_LANDMARKS, :2], dtype=np.float64)
+    cam = camera_matrix(w, h) if cam is None else cam
+    ok, rvec, _ = cv2.solvePnP(FACE_MODEL_3D, image_pts, cam, _NO_DISTORTION,
+                               flags=cv2.SOLVEPNP_ITERATIVE)
+    if not ok:
+        return None
+    rot, _ = cv2.Rodrigues(rvec)
+    return rotation_to_euler(rot)
+
+
+def rotation_to_euler(rot):
+    # R = Rz(roll) @ Ry(yaw) @ Rx(pitch)
+    sy = np.hypot(rot[0, 0], rot[1, 0])
+    pitch = np.degrees(np.arctan2(rot[2, 1], rot[2, 2]))
+    yaw = np.degrees(np.arctan2(-rot[2, 0], sy))
+    roll = np.degrees(np.arctan2(rot[1, 0], rot[0, 0]))
+    # solvePnP may land on the mirrored solution; fold pitch back into [-90, 90]
+    if pitch > 90:
+        pitch -= 180
+    elif pitch < -90:
+        pitch += 180
+    # flip yaw so that positive means the nose points to image right
+    return float(-yaw), float(pitch), float(roll)
+
+
+def classify_pose(yaw, pitch):
+    if abs(yaw) > YAW_LIMIT:
+        return "away"
+    if abs(pitch) <= SCREEN_PITCH:
+        return "screen"
+    if SCREEN_PITCH < pitch <= NOTEBOOK_PITCH:
+        return "notebook"
+    return "away"
+
+
+def head_pose_from_points(points, img_shape):
+    """(N, 2+) landmark pixels -> screen / notebook / away."""
+    h, w = img_shape
+    pose = estimate_pose(points, w, h)
+    if pose is None:
+        return "away"
+    yaw, pitch, _ = pose
+    return classify_pose(yaw, pitch)
+
+
+def get_head_pose(landmarks, img_shape):
+    """Drop-in for the old per-detector helper: returns screen / notebook / away."""
+    h, w = img_shape
+    return head_pose_from_points(landmarks_to_array(landmarks, w, h), img_shape)
+
+
+# ----- Batch mode (offline re-scoring of recorded landmark streams) -----
+def estimate_pose_batch(points, w, h):
+    """(F, N, 2+) landmarks for F frames -> (F, 3) array of yaw, pitch, roll.
+
+    Frames where solvePnP fails come back as NaN.
+    """
+    points = np.asarray(points)
+    cam = camera_matrix(w, h)
+    out = np.full((len(points), 3), np.nan)
+    for i, frame_pts in enumerate(points):
+        pose = estimate_pose(frame_pts, w, h, cam)
+        if pose is not None:
+            out[i] = pose
+    return out
+
+
+def classify_pose_batch(yaw, pitch):
+    """Vectorized classify_pose over arrays of angles -> array of labels."""
+    yaw = np.asarray(yaw, dtype=np.float64)
+    pitch = np.asarray(pitch, dtype=np.float64)
+    facing = np.abs(yaw) <= YAW_LIMIT
+    screen = facing & (np.abs(pitch) <= SCREEN_PITCH)
+    notebook = facing & (pitch > SCREEN_PITCH) & (pitch <= NOTEBOOK_PITCH)
+    return np.select([screen, notebook], ["screen", "notebook"], default="away")
@@ -0,0 +1,136 @@
+# Follow today's focus-log CSV while it is being written.
+#
+# A DayTail remembers how many bytes of the file it has already consumed and
+# on every poll() parses only the complete lines appended since then. KPIs,
+# status counts and the focus-trend series are updated from each new chunk,
+# so keeping the dashboard open during a session costs almost nothing even
+# when the file has grown to tens of thousands of rows.
+import csv
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from focus_store import focused_mask, normalize
+
+
+class DayTail:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.columns = None
+        self.rows = 0
+        self.focused_rows = 0
+        self.score_sum = 0.0
+        self.phone_rows = 0
+        self._status_counts = {}
+        self._chunks = []
+        self._frame = None
+        self._ts = []
+        self._scores = []
+
+    # ----- reading -----
+    def poll(self):
+        """Parse lines appended since the last poll; returns how many rows were added."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return 0
+            if size < self.offset:
+                # file was replaced or truncated: start over
+                self._reset()
+            if size == self.offset:
+                return 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+            end = data.rfind(b"\n")
+            if end < 0:
+                return 0  # only a half-written line so far
+            data = data[:end + 1]
+            self.offset += len(data)
+
+            if self.columns is None:
+                nl = data.index(b"\n")
+                self.columns = next(csv.reader([data[:nl].decode("utf-8")]))
+                data = data[nl + 1:]
+                if not data:
+                    return 0
+            return self._add_chunk(data)
+
+    def _add_chunk(self, data):
+        chunk = pd.read_csv(io.BytesIO(data), names=self.columns, header=None)
+        chunk = normalize(chunk).dropna(subset=["timestamp"])
+        if chunk.empty:
+            return 0
+
+        self.rows += len(chunk)
+        self.focused_rows += int(focused_mask(chunk["status"]).sum())
+        self.score_sum += float(chunk["focus_score"].sum())
+        if "phone_detected" in chunk.columns:
+            self.phone_rows += int(chunk["phone_detected"].sum())
+        for status, n in chunk["status"].value_counts().items():
+            if n:
+                self._status_counts[status] = self._status_counts.get(status, 0) + int(n)
+
+        self._ts.append(chunk["timestamp"].to_numpy())
+        self._scores.append(chunk["focus_score"].to_numpy())
+        self._chunks.append(chunk)
+        self._frame = None
+        return len(chunk)
+
+    # ----- views -----
+    def kpis(self):
+        return {
+            "total_rows": self.rows,
+            "focus_pct": (self.focused_rows / self.rows * 100) if self.rows else 0,
+            "avg_score": (self.score_sum / self.rows) if self.rows else 0,
+            "phone_rows": self.phone_rows,
+        }
+
+    def status_counts(self):
+        counts = sorted(self._status_counts.items(), key=lambda kv: kv[1], reverse=True)
+        return pd.DataFrame(counts, columns=["status", "count"])
+
+    def trend(self):
+        """(timestamps, scores) as flat arrays; chunks are merged once and reused."""
+        with self._lock:
+            if len(self._ts) > 1:
+                self._ts = [np.concatenate(self._ts)]
+                self._scores = [np.concatenate(self._scores)]
+            if not self._ts:
+                return np.array([], dtype="datetime64[ns]"), np.array([], dtype="float32")
+            return self._ts[0], self._scores[0]
+
+    def frame(self):
+        """Everything read so far as one DataFrame (for the raw-log style views)."""
+        with self._lock:
+            if self._frame is None:
+                if not self._chunks:
+                    self._frame = pd.DataFrame(columns=self.columns or [])
+                else:
+                    self._frame = normalize(pd.concat(self._chunks, ignore_index=True))
+                    self._chunks = [self._frame]
+            return self._frame
+
+
+_TAILS = {}
+_TAILS_LOCK = threading.Lock()
+
+
+def get_tail(path):
+    """One DayTail per file for the whole process, so reruns keep the offset."""
+    path = os.path.abspath(path)
+    with _TAILS_LOCK:
+        tail = _TAILS.get(path)
+        if tail is None:
+            tail = _TAILS[path] = DayTail(path)
+        return tail
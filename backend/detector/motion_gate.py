@@ -0,0 +1,64 @@
+import time
+
+import cv2
+import numpy as np
+
+
+# ----- Skip analysis while the scene is static -----
+class MotionGate:
+    """Decides whether a frame differs enough from the last analyzed one to rerun the models.
+
+    method="diff" compares mean absolute difference of a small grayscale
+    thumbnail (0-255 scale); method="hash" compares a 64-bit difference hash
+    by Hamming distance. Either way a frame is analyzed at least every
+    `max_stale_sec`, so slow drifts (lighting, a phone creeping into view)
+    are still picked up.
+    """
+
+    def __init__(self, threshold=4.0, max_stale_sec=2.0, method="diff", thumb_size=(80, 60)):
+        self.threshold = threshold
+        self.max_stale_sec = max_stale_sec
+        self.method = method
+        self.thumb_size = thumb_size if method == "diff" else (9, 8)
+
+        self._ref = None
+        self._ref_time = 0.0
+        self.analyzed = 0
+        self.skipped = 0
+
+    def _signature(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if self.method == "hash":
+            return small[:, 1:] > small[:, :-1]
+        return small
+
+    def _distance(self, sig):
+        if self.method == "hash":
+            return float(np.count_nonzero(sig != self._ref))
+        return float(np.mean(cv2.absdiff(sig, self._ref)))
+
+    def check(self, frame, now=None):
+        """True if the frame should be analyzed; the gate then uses it as the new reference."""
+        now = time.time() if now is None else now
+        sig = self._signature(frame)
+        if (self._ref is not None
+                and now - self._ref_time < self.max_stale_sec
+                and self._distance(sig) < self.threshold):
+            self.skipped += 1
+            return False
+        self._ref = sig
+        self._ref_time = now
+        self.analyzed += 1
+        return True
+
+    def reset(self):
+        self._ref = None
+
+    def stats(self):
+        total = self.analyzed + self.skipped
+        return {
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,165 @@
+# On-frame HUD drawn from a cached layer.
+#
+# The status line, score text, score bar and key hints used to be redrawn
+# with putText / rectangle on every frame although they change a few times a
+# minute. HudOverlay renders each element once into its own band of a small
+# layer (colour drawn over black = premultiplied colour, plus the same shape
+# drawn as a coverage mask) and re-renders a band only when its value
+# changes. Per frame each band is blended in with two saturating OpenCV ops
+# over just its bounding box: frame * (1 - alpha) + layer. Bands without
+# anti-aliased edges (the score bar) are a plain masked copy.
+import cv2
+import numpy as np
+
+from face_tracker import draw_landmark_edges
+from head_pose import POSE_LANDMARKS
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# landmark drawing: "contours" (full mediapipe contour set), "oval" (face
+# outline only), "pose" (the 6 points head pose is computed from) or "off"
+LANDMARK_MODES = ("contours", "oval", "pose", "off")
+
+
+def _text_band(org_y, scale, thickness):
+    (_, h), _ = cv2.getTextSize("Ag", FONT, scale, thickness)
+    (_, _), descent = cv2.getTextSize("gjpqy()|", FONT, scale, thickness)
+    return org_y - h - thickness - 2, org_y + descent + thickness + 2
+
+
+class HudOverlay:
+    """Status / focus score / score bar / hint, same layout as the old putText calls."""
+
+    STATUS_ORG = (30, 50)
+    SCORE_ORG = (30, 90)
+    BAR = (30, 110, 300, 20)  # x, y, w, h
+    HINT_ORG = (30, 150)
+
+    def __init__(self, hint=None):
+        self.hint = hint
+        bx, by, bw, bh = self.BAR
+        self._bands = {
+            "status": _text_band(self.STATUS_ORG[1], 1.0, 3),
+            "score": _text_band(self.SCORE_ORG[1], 0.9, 2),
+            "bar": (by - 2, by + bh + 3),
+            "hint": _text_band(self.HINT_ORG[1], 0.6, 1),
+        }
+        self._height = max(y1 for _, y1 in self._bands.values())
+        self._width = None
+        self._layer = None
+        self._mask = None
+        self._values = {}
+        self._blits = {}  # band -> (x0, y0, layer crop, mask crop, 255 - alpha crop or None) or None
+
+        self.frames = 0
+        self.renders = 0
+
+    # ----- layer upkeep -----
+    def _reset(self, width):
+        self._width = width
+        self._layer = np.zeros((self._height, width, 3), np.uint8)
+        self._mask = np.zeros((self._height, width), np.uint8)
+        self._values = {}
+        self._blits = {}
+
+    def _render(self, name, value, draw):
+        """Redraw band `name` if its value changed; draw(img, color_or_none) paints it."""
+        if self._values.get(name, object()) == value:
+            return
+        y0, y1 = self._bands[name]
+        y0 = max(y0, 0)
+        self._layer[y0:y1] = 0
+        self._mask[y0:y1] = 0
+        draw(self._layer, None)
+        draw(self._mask, 255)
+        x, y, w, h = cv2.boundingRect(self._mask[y0:y1])
+        if w and h:
+            ys, xs = slice(y0 + y, y0 + y + h), slice(x, x + w)
+            mask = self._mask[ys, xs].copy()
+            inv_alpha = None
+            if np.count_nonzero((mask > 0) & (mask < 255)):
+                inv_alpha = cv2.cvtColor(255 - mask, cv2.COLOR_GRAY2BGR)
+            self._blits[name] = (x, y0 + y, self._layer[ys, xs].copy(), mask, inv_alpha)
+        else:
+            self._blits[name] = None
+        self._values[name] = value
+        self.renders += 1
+
+    def _status(self, status, color):
+        def draw(img, ink):
+            cv2.putText(img, status, self.STATUS_ORG, FONT, 1.0, ink if ink is not None else color, 3)
+        return draw
+
+    def _score(self, focus_score):
+        def draw(img, ink):
+            cv2.putText(img, f"Focus Score: {focus_score}/100", self.SCORE_ORG, FONT, 0.9,
+                        ink if ink is not None else (255, 255, 255), 2)
+        return draw
+
+    def _bar(self, fill_w):
+        bx, by, bw, bh = self.BAR
+
+        def draw(img, ink):
+            cv2.rectangle(img, (bx, by), (bx + bw, by + bh), ink if ink is not None else (200, 200, 200), 2)
+            cv2.rectangle(img, (bx, by), (bx + fill_w, by + bh), ink if ink is not None else (0, 255, 0), -1)
+        return draw
+
+    def _hint(self):
+        def draw(img, ink):
+            cv2.putText(img, self.hint, self.HINT_ORG, FONT, 0.6, ink if ink is not None else (255, 255, 255), 1)
+        return draw
+
+    # ----- per frame -----
+    def draw(self, frame, status, color, focus_score):
+        h, w = frame.shape[:2]
+        if w != self._width:
+            self._reset(w)
+        self.frames += 1
+
+        self._render("status", (status, color), self._status(status, color))
+        self._render("score", focus_score, self._score(focus_score))
+        fill_w = int(self.BAR[2] * (focus_score / 100.0))
+        self._render("bar", fill_w, self._bar(fill_w))
+        if self.hint:
+            self._render("hint", self.hint, self._hint())
+
+        for blit in self._blits.values():
+            if blit is None:
+                continue
+            x0, y0, layer, mask, inv_alpha = blit
+            bh, bw = layer.shape[:2]
+            if y0 + bh > h or x0 + bw > w:
+                continue  # frame smaller than the HUD
+            roi = frame[y0:y0 + bh, x0:x0 + bw]
+            # all of these write straight into the frame view
+            if inv_alpha is None:
+                cv2.copyTo(layer, mask, roi)
+            else:
+                cv2.multiply(roi, inv_alpha, dst=roi, scale=1.0 / 255)
+                cv2.add(roi, layer, dst=roi)
+        return frame
+
+    def stats(self):
+        return {"frames": self.frames, "renders": self.renders}
+
+
+# ----- landmarks -----
+def landmark_edges(mode):
+    """(E, 2) landmark index pairs drawn in `mode`, or None for the point / off modes."""
+    if mode in ("pose", "off"):
+        return None
+    import mediapipe as mp
+    face_mesh = mp.solutions.face_mesh
+    connections = face_mesh.FACEMESH_FACE_OVAL if mode == "oval" else face_mesh.FACEMESH_CONTOURS
+    return np.array(sorted(connections), dtype=np.int64)
+
+
+def draw_landmarks(frame, points, mode, edges=None):
+    """One face's landmarks (N x 3 pixel array); cost depends on the mode, not on N."""
+    if mode == "off":
+        return
+    if mode == "pose":
+        for x, y in points[POSE_LANDMARKS, :2].astype(np.int32):
+            cv2.circle(frame, (int(x), int(y)), 3, (192, 192, 192), -1, cv2.LINE_AA)
+        return
+    draw_landmark_edges(frame, points, edges)
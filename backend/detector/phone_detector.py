@@ -0,0 +1,337 @@
+import os
+
+import cv2
+import numpy as np
+
+PHONE_CLASS = "cell phone"
+PHONE_CONF = 0.5
+NMS_IOU = 0.45
+COCO_PHONE_ID = 67
+
+DETECTOR_DIR = os.path.dirname(os.path.abspath(__file__))
+# the OpenCV backend needs Darknet weights next to yolov3-tiny.cfg (~35 MB, not in git):
+#   curl -L -o backend/detector/yolov3-tiny.weights https://pjreddie.com/media/files/yolov3-tiny.weights
+DARKNET_WEIGHTS_URL = "https://pjreddie.com/media/files/yolov3-tiny.weights"
+MIN_WEIGHTS_BYTES = 1_000_000  # real yolov3-tiny.weights is ~35 MB; an HTML error page is a few KB
+
+
+# ----- Plain YOLO phone check (one full detector pass) -----
+def detect_phones(yolo_model, frame):
+    boxes = []
+    results = yolo_model(frame, verbose=False)
+    for r in results:
+        for box in r.boxes:
+            cls = int(box.cls[0])
+            conf = float(box.conf[0])
+            if r.names[cls] == PHONE_CLASS and conf > PHONE_CONF:
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                boxes.append((x1, y1, x2, y2))
+    return boxes
+
+
+# ----- Phone-only, reduced-resolution detector (Ultralytics backend) -----
+class PhoneDetector:
+    """YOLO restricted to the phone class at a smaller input size.
+
+    mode="phone" asks the model for the phone class only (NMS and scoring
+    skip the other 79 classes) at `imgsz`, and filters the result tensors in
+    one vectorized step. mode="full" is the original all-class pass.
+    """
+
+    def __init__(self, yolo_model, mode="phone", imgsz=416, conf=PHONE_CONF):
+        self.model = yolo_model
+        self.mode = mode
+        self.imgsz = imgsz
+        self.conf = conf
+        names = getattr(yolo_model, "names", {}) or {}
+        self.phone_id = next((i for i, n in names.items() if n == PHONE_CLASS), COCO_PHONE_ID)
+
+    def __call__(self, frame):
+        if self.mode == "full":
+            return detect_phones(self.model, frame)
+
+        results = self.model.predict(
+            frame,
+            imgsz=self.imgsz,
+            classes=[self.phone_id],
+            conf=self.conf,
+            verbose=False,
+        )
+        boxes = []
+        for r in results:
+            b = r.boxes
+            if b is None or len(b) == 0:
+                continue
+            keep = (b.cls == self.phone_id) & (b.conf > self.conf)
+            xyxy = b.xyxy[keep].int().cpu().numpy()
+            boxes.extend(tuple(row) for row in xyxy.tolist())
+        return boxes
+
+    def detect(self, frame):
+        """Returns (phone_detected, boxes)."""
+        boxes = self(frame)
+        return bool(boxes), boxes
+
+
+def _nms(boxes_xywh, scores, conf):
+    # boxes in pixel x, y, w, h -> list of (x1, y1, x2, y2)
+    if len(boxes_xywh) == 0:
+        return []
+    keep = cv2.dnn.NMSBoxes(boxes_xywh, scores, conf, NMS_IOU)
+    out = []
+    for i in np.array(keep).reshape(-1):
+        x, y, w, h = boxes_xywh[i]
+        out.append((int(x), int(y), int(x + w), int(y + h)))
+    return out
+
+
+# ----- ONNX Runtime backend (exported yolov8n.onnx) -----
+class OnnxPhoneDetector:
+    """yolov8n exported to ONNX, run with onnxruntime on CPU (no torch import).
+
+    Export once with: yolo export model=yolov8n.pt format=onnx imgsz=416
+    """
+
+    def __init__(self, model_path="yolov8n.onnx", imgsz=416, conf=PHONE_CONF, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        # a static export fixes the input size; honour it over the setting
+        shape = inp.shape
+        self.imgsz = shape[2] if isinstance(shape[2], int) else imgsz
+        self.conf = conf
+        self.phone_id = COCO_PHONE_ID
+
+    def _letterbox(self, frame):
+        h, w = frame.shape[:2]
+        r = min(self.imgsz / h, self.imgsz / w)
+        nh, nw = int(round(h * r)), int(round(w * r))
+        pad_y, pad_x = (self.imgsz - nh) // 2, (self.imgsz - nw) // 2
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+        return blob, r, pad_x, pad_y
+
+    def __call__(self, frame):
+        blob, r, pad_x, pad_y = self._letterbox(frame)
+        # yolov8 output: (1, 4 + num_classes, num_anchors) with cx, cy, w, h first
+        pred = self.session.run(None, {self.input_name: blob})[0][0]
+        scores = pred[4 + self.phone_id]
+        keep = scores > self.conf
+        if not np.any(keep):
+            return []
+        cx, cy, bw, bh = pred[:4, keep]
+        x = (cx - bw / 2 - pad_x) / r
+        y = (cy - bh / 2 - pad_y) / r
+        boxes = np.stack([x, y, bw / r, bh / r], axis=1)
+        return _nms(boxes.tolist(), scores[keep].tolist(), self.conf)
+
+
+# ----- OpenCV DNN backend (yolov3-tiny) -----
+def check_darknet_weights(path):
+    """Raise a clear error unless `path` looks like Darknet weights (size + version header)."""
+    hint = f"expected Darknet yolov3-tiny.weights, download: curl -L -o {path} {DARKNET_WEIGHTS_URL}"
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; {hint}")
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(12)
+    # header: int32 major, minor, revision (yolov3-tiny: 0, 2, 0)
+    major, minor, _ = np.frombuffer(header, "<i4") if len(header) == 12 else (-1, -1, -1)
+    if size < MIN_WEIGHTS_BYTES or not (0 <= major < 10 and 0 <= minor < 100):
+        raise ValueError(f"{path} is not a Darknet weights file ({size} bytes, starts with {header[:8]!r}); {hint}")
+
+
+class DnnPhoneDetector:
+    """yolov3-tiny via cv2.dnn: cfg + coco.names in this folder, weights downloaded (see above)."""
+
+    def __init__(self, cfg=None, weights=None, names=None, imgsz=416, conf=PHONE_CONF):
+        cfg = cfg or os.path.join(DETECTOR_DIR, "yolov3-tiny.cfg")
+        weights = weights or os.path.join(DETECTOR_DIR, "yolov3-tiny.weights")
+        names = names or os.path.join(DETECTOR_DIR, "coco.names")
+
+        check_darknet_weights(weights)
+        self.net = cv2.dnn.readNetFromDarknet(cfg, weights)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.out_layers = self.net.getUnconnectedOutLayersNames()
+        with open(names) as f:
+            classes = [line.strip() for line in f if line.strip()]
+        self.phone_id = classes.index(PHONE_CLASS) if PHONE_CLASS in classes else COCO_PHONE_ID
+        # darknet input must be a multiple of 32
+        self.imgsz = max(32, int(imgsz) // 32 * 32)
+        self.conf = conf
+
+    def __call__(self, frame):
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, (self.imgsz, self.imgsz), swapRB=True, crop=False)
+        self.net.setInput(blob)
+        # each row: cx, cy, w, h (normalized), objectness, 80 class scores; the
+        # region layer already multiplies the class scores by objectness
+        pred = np.vstack(self.net.forward(self.out_layers))
+        scores = pred[:, 5 + self.phone_id]
+        keep = scores > self.conf
+        if not np.any(keep):
+            return []
+        cx, cy, bw, bh = (pred[keep, :4] * np.array([w, h, w, h], dtype=np.float32)).T
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, bw, bh], axis=1)
+        return _nms(boxes.tolist(), scores[keep].tolist(), self.conf)
+
+
+DETECTOR_BACKENDS = ("ultralytics", "onnx", "opencv")
+
+
+def create_phone_detector(backend="ultralytics", mode="phone", imgsz=416, model_path=None, threads=None):
+    """Build the phone detector for the configured backend.
+
+    Heavy imports (ultralytics/torch, onnxruntime) happen here, so a process
+    that picks the OpenCV backend never loads torch at all. threads caps the
+    intra-op threads of the inference library (torch's cap is process-wide).
+    """
+    if backend == "ultralytics":
+        from ultralytics import YOLO
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return PhoneDetector(YOLO(model_path or "yolov8n.pt"), mode=mode, imgsz=imgsz)
+    if backend == "onnx":
+        return OnnxPhoneDetector(model_path or "yolov8n.onnx", imgsz=imgsz, threads=threads)
+    if backend == "opencv":
+        return DnnPhoneDetector(imgsz=imgsz)
+    raise ValueError(f"Unknown detector backend {backend!r}, expected one of {DETECTOR_BACKENDS}")
+
+
+def draw_phone_boxes(frame, boxes):
+    for x1, y1, x2, y2 in boxes:
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        cv2.putText(frame, "Phone", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
+
+def _create_tracker():
+    # KCF is cheap; fall back through whatever this OpenCV build ships
+    for factory in ("TrackerKCF_create", "TrackerMIL_create"):
+        fn = getattr(cv2, factory, None)
+        if fn is None and hasattr(cv2, "legacy"):
+            fn = getattr(cv2.legacy, factory, None)
+        if fn is not None:
+            return fn()
+    return None
+
+
+def iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+# ----- Adaptive scheduler -----
+class PhoneScheduler:
+    """Runs the phone detector only every N frames (or on motion) and tracks in between.
+
+    While a phone is on screen the detector runs every `active_every_n`
+    frames so the box stays accurate and the phone is dropped quickly once
+    it leaves; otherwise it runs every `idle_every_n` frames. A big change in
+    a tiny grayscale thumbnail since the last detector run forces a run
+    early, so a phone picked up between runs is not missed.
+    """
+
+    def __init__(self, detect_fn, idle_every_n=10, active_every_n=2,
+                 motion_threshold=12.0, use_tracker=True, thumb_size=(64, 48)):
+        self.detect_fn = detect_fn
+        self.idle_every_n = idle_every_n
+        self.active_every_n = active_every_n
+        self.motion_threshold = motion_threshold
+        self.use_tracker = use_tracker
+        self.thumb_size = thumb_size
+
+        self.boxes = []
+        self._trackers = []
+        self._since_detect = None
+        self._ref_thumb = None
+
+        self.frames = 0
+        self.detector_runs = 0
+        self.motion_triggers = 0
+        self.track_failures = 0
+
+    def _thumb(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+
+    def _motion(self, thumb):
+        if self._ref_thumb is None:
+            return float("inf")
+        return float(np.mean(cv2.absdiff(thumb, self._ref_thumb)))
+
+    def _run_detector(self, frame, thumb):
+        self.detector_runs += 1
+        self._since_detect = 0
+        self._ref_thumb = thumb
+        self.boxes = list(self.detect_fn(frame))
+        self._trackers = []
+        if self.use_tracker:
+            for x1, y1, x2, y2 in self.boxes:
+                tracker = _create_tracker()
+                if tracker is None:
+                    break
+                tracker.init(frame, (x1, y1, x2 - x1, y2 - y1))
+                self._trackers.append(tracker)
+
+    def _propagate(self, frame):
+        # no tracker available: keep the last boxes (IoU-stable between runs)
+        if not self._trackers:
+            return True
+        tracked = []
+        for tracker, prev in zip(self._trackers, self.boxes):
+            ok, (x, y, w, h) = tracker.update(frame)
+            if not ok:
+                return False
+            box = (int(x), int(y), int(x + w), int(y + h))
+            # a box that jumped away from where it was is a lost track
+            if iou(prev, box) <= 0.1:
+                return False
+            tracked.append(box)
+        self.boxes = tracked
+        return True
+
+    @property
+    def interval(self):
+        return self.active_every_n if self.boxes else self.idle_every_n
+
+    def update(self, frame):
+        """Returns (phone_detected, boxes) for this frame."""
+        self.frames += 1
+        thumb = self._thumb(frame)
+
+        if self._since_detect is None or self._since_detect + 1 >= self.interval:
+            self._run_detector(frame, thumb)
+        elif self._motion(thumb) >= self.motion_threshold:
+            self.motion_triggers += 1
+            self._run_detector(frame, thumb)
+        else:
+            self._since_detect += 1
+            if not self._propagate(frame):
+                self.track_failures += 1
+                self._run_detector(frame, thumb)
+
+        return bool(self.boxes), self.boxes
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "detector_runs": self.detector_runs,
+            "motion_triggers": self.motion_triggers,
+            "track_failures": self.track_failures,
+            "detect_ratio": round(self.detector_runs / self.frames, 3) if self.frames else 0.0,
+        }
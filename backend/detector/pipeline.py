@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+
+
+# ----- Bounded queue that drops the oldest item when full -----
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        # returns None on timeout or once the queue is closed and drained
+        with self._cond:
+            if not self._items and not self.closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# ----- Per-stage throughput counters -----
+class StageStats:
+    def __init__(self, name, window_sec=5.0):
+        self.name = name
+        self.window_sec = window_sec
+        self.processed = 0
+        self.errors = 0
+        self.busy_sec = 0.0
+        self._stamps = deque()
+        self._lock = threading.Lock()
+
+    def record(self, busy_sec):
+        now = time.time()
+        with self._lock:
+            self.processed += 1
+            self.busy_sec += busy_sec
+            self._stamps.append(now)
+            while self._stamps and now - self._stamps[0] > self.window_sec:
+                self._stamps.popleft()
+
+    def fps(self):
+        now = time.time()
+        with self._lock:
+            recent = [t for t in self._stamps if now - t <= self.window_sec]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+
+    def snapshot(self):
+        return {
+            "fps": round(self.fps(), 2),
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_ms": round(1000.0 * self.busy_sec / self.processed, 2) if self.processed else 0.0,
+        }
+
+
+# ----- One worker thread: pull from inbox, run fn, push to outbox -----
+class Stage(threading.Thread):
+    def __init__(self, name, fn, inbox=None, outbox=None, stop_event=None):
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop_event = stop_event or threading.Event()
+        self.stats = StageStats(name)
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.inbox is not None:
+                    item = self.inbox.get(timeout=0.5)
+                    if item is None:
+                        if self.inbox.closed:
+                            break
+                        continue
+                t0 = time.perf_counter()
+                try:
+                    # source stage (no inbox): fn() produces items on its own
+                    out = self.fn(item) if self.inbox is not None else self.fn()
+                except Exception as e:
+                    # one bad frame must not kill the stage: log it and skip the item
+                    self.stats.errors += 1
+                    print(f"⚠️ {self.name} stage error: {e!r}")
+                    if self.inbox is None:
+                        time.sleep(0.05)  # don't spin on a failing source
+                    continue
+                if out is StopIteration:
+                    break
+                if out is None:
+                    continue
+                self.stats.record(time.perf_counter() - t0)
+                if self.outbox is not None:
+                    self.outbox.put(out)
+        finally:
+            # whatever ended this stage ends the whole pipeline
+            self.stop_event.set()
+            if self.inbox is not None:
+                self.inbox.close()
+            if self.outbox is not None:
+                self.outbox.close()
+
+
+# ----- Capture -> analysis -> encode pipeline -----
+class FramePipeline:
+    """Runs each stage in its own thread, linked by 1-slot drop-oldest queues.
+
+    The capture stage never waits on analysis, so the camera buffer is always
+    drained and the analyzer always picks up the freshest frame. Encoded
+    frames go to `sink` (anything with put/close, e.g. a FrameHub) or to a
+    plain drop-oldest queue when no sink is given.
+    """
+
+    def __init__(self, read_fn, analyze_fn, encode_fn, queue_size=1, sink=None):
+        # items travel as (capture_ts, payload) so end-to-end latency is known
+        self.stop_event = threading.Event()
+        self.latency_ms = 0.0
+        self.raw_q = DropOldestQueue(queue_size)
+        self.annotated_q = DropOldestQueue(queue_size)
+        self.encoded_q = sink if sink is not None else DropOldestQueue(queue_size)
+        self.stages = [
+            Stage("capture", read_fn, None, self.raw_q, self.stop_event),
+            Stage("analysis", analyze_fn, self.raw_q, self.annotated_q, self.stop_event),
+            Stage("encode", self._timed(encode_fn), self.annotated_q, self.encoded_q, self.stop_event),
+        ]
+
+    def _timed(self, fn):
+        def wrapped(item):
+            out = fn(item)
+            if out is not None:
+                # exponential moving average keeps the number readable
+                self.latency_ms = 0.9 * self.latency_ms + 100.0 * (time.time() - out[0])
+            return out
+        return wrapped
+
+    def start(self):
+        for s in self.stages:
+            s.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for q in (self.raw_q, self.annotated_q):
+            q.close()
+
+    def join(self, timeout=None):
+        for s in self.stages:
+            s.join(timeout)
+
+    def is_running(self):
+        # a pipeline missing a stage delivers nothing: treat it as stopped
+        return all(s.is_alive() for s in self.stages)
+
+    def stats(self):
+        queues = {"raw": self.raw_q, "annotated": self.annotated_q}
+        if isinstance(self.encoded_q, DropOldestQueue):
+            queues["encoded"] = self.encoded_q
+        return {
+            "latency_ms": round(self.latency_ms, 1),
+            "stages": {s.name: s.stats.snapshot() for s in self.stages},
+            "queues": {
+                name: {"depth": len(q), "dropped": q.dropped}
+                for name, q in queues.items()
+            },
+        }
@@ -0,0 +1,260 @@
+# Report generation + backend upload off the Streamlit script thread.
+#
+# The dashboard submits a job and gets an id back straight away; one worker
+# thread builds the PDF and uploads it through a pooled requests.Session
+# (connect/read timeouts, exponential-backoff retries on connection errors
+# and 5xx). Every upload is written to a spool directory first and only
+# removed once the backend accepted it, so a PDF made while the Node backend
+# is down is sent later instead of being lost. A 4xx answer is final (the
+# backend won't take that upload however often it is sent), and spool entries
+# that can't be read are moved to upload_spool/failed/. The page just polls
+# status().
+#
+# Point upload_url at any HTTP server to try it out, e.g. a local stub:
+#   python -m http.server 8000   (returns 501 for POST -> job ends "spooled")
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from reports import day_report_from_log, monthly_report, weekly_report
+
+UPLOAD_TIMEOUT = (3.05, 20)   # (connect, read) seconds
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 0.5          # 0.5, 1, 2 s between attempts
+SPOOL_RETRY_SEC = 60          # how often spooled uploads are retried
+MAX_JOBS_KEPT = 50
+
+
+# ----- HTTP -----
+def make_session(retries=UPLOAD_RETRIES, backoff=UPLOAD_BACKOFF):
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,  # a read timeout may mean the report was saved: leave it to the spool
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),  # uploadReport answers 500 only when nothing was saved
+        allowed_methods=None,  # retry POST too
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class ReportUploader:
+    def __init__(self, url, spool_dir, timeout=UPLOAD_TIMEOUT, session=None):
+        self.url = url
+        self.spool_dir = spool_dir
+        self.failed_dir = os.path.join(spool_dir, "failed")
+        self.timeout = timeout
+        self.session = session or make_session()
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def _paths(self, spool_id):
+        base = os.path.join(self.spool_dir, spool_id)
+        return base + ".pdf", base + ".json"
+
+    def spool(self, pdf_bytes, title):
+        spool_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        pdf_path, meta_path = self._paths(spool_id)
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes)
+        # meta last: a spool entry only counts once its .json exists
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"title": title, "created": time.time()}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return spool_id
+
+    def pending(self):
+        return sorted(f[:-5] for f in os.listdir(self.spool_dir) if f.endswith(".json"))
+
+    def discard(self, spool_id, reason):
+        # out of the retry loop, but kept for a look by hand
+        os.makedirs(self.failed_dir, exist_ok=True)
+        for path in self._paths(spool_id):
+            if os.path.exists(path):
+                os.replace(path, os.path.join(self.failed_dir, os.path.basename(path)))
+        print(f"⚠️ Spooled upload {spool_id} dropped ({reason}), moved to {self.failed_dir}")
+
+    def send(self, spool_id):
+        """Upload one spooled PDF. Returns (state, error).
+
+        state: "done" (sent and removed), "spooled" (kept for a retry) or
+        "failed" (rejected with a 4xx or unreadable; moved to failed/).
+        """
+        pdf_path, meta_path = self._paths(spool_id)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            title = meta["title"]
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            error = f"broken spool entry: {e!r}"
+            self.discard(spool_id, error)
+            return "failed", error
+        try:
+            res = self.session.post(
+                self.url,
+                files={"pdf": ("report.pdf", pdf_bytes, "application/pdf")},
+                data={"title": title},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            return "spooled", str(e)
+        if 400 <= res.status_code < 500:
+            error = f"upload rejected: HTTP {res.status_code}"
+            self.discard(spool_id, error)
+            return "failed", error
+        if res.status_code != 200:
+            return "spooled", f"HTTP {res.status_code}"
+        os.remove(meta_path)
+        os.remove(pdf_path)
+        return "done", None
+
+    def send_pending(self):
+        sent = 0
+        for spool_id in self.pending():
+            try:
+                state, _ = self.send(spool_id)
+            except OSError as e:
+                print(f"⚠️ Spooled upload {spool_id} not sent: {e!r}")
+                continue
+            sent += state == "done"
+        return sent
+
+
+# ----- jobs -----
+class ReportJobQueue(threading.Thread):
+    """Builds report PDFs (and uploads them) on a background thread.
+
+    submit() returns a job id; status() returns a dict with state
+    "queued" / "building" / "uploading" / "done" / "spooled" / "failed",
+    the PDF bytes once built, and the upload error if any. "spooled" means
+    the PDF is ready but the backend could not take it yet; it is retried
+    every SPOOL_RETRY_SEC.
+    """
+
+    BUILDERS = {
+        "weekly": lambda log_dir, p: weekly_report(log_dir),
+        "monthly": lambda log_dir, p: monthly_report(log_dir),
+        "day": lambda log_dir, p: day_report_from_log(log_dir, p["date"], p.get("method", "lttb")),
+    }
+
+    def __init__(self, log_dir, upload_url, spool_dir=None, session=None):
+        super().__init__(name="report-jobs", daemon=True)
+        self.log_dir = log_dir
+        self.uploader = ReportUploader(upload_url, spool_dir or os.path.join(log_dir, "upload_spool"),
+                                       session=session)
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_spool_retry = 0.0
+
+    def submit(self, kind, title=None, upload=False, **params):
+        if kind not in self.BUILDERS:
+            raise ValueError(f"unknown report kind: {kind}")
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id, "kind": kind, "title": title or f"Study Report ({kind})",
+            "upload": upload, "params": params, "state": "queued",
+            "pdf": None, "error": None, "created": time.time(),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                self._jobs.popitem(last=False)
+        self._queue.put(job_id)
+        return job_id
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _set(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _run_job(self, job):
+        self._set(job, state="building")
+        try:
+            pdf = self.BUILDERS[job["kind"]](self.log_dir, job["params"])
+        except Exception as e:
+            self._set(job, state="failed", error=f"build failed: {e}")
+            return
+        if pdf is None:
+            self._set(job, state="failed", error="no data")
+            return
+        if not job["upload"]:
+            self._set(job, state="done", pdf=pdf)
+            return
+
+        self._set(job, state="uploading", pdf=pdf)
+        try:
+            spool_id = self.uploader.spool(pdf, job["title"])
+        except OSError as e:  # e.g. disk full: the PDF is still there to download
+            self._set(job, state="failed", error=f"could not spool the upload: {e}")
+            return
+        state, error = self.uploader.send(spool_id)
+        self._set(job, state=state, error=error)
+
+    def _retry_spool(self):
+        try:
+            self.uploader.send_pending()
+        except Exception as e:
+            print(f"⚠️ Spool retry failed: {e!r}")
+
+    def run(self):
+        # nothing in here may end the thread: jobs submitted later would stay "queued"
+        self._retry_spool()  # leftovers from the last run
+        self._last_spool_retry = time.time()
+        while True:
+            try:
+                job_id = self._queue.get(timeout=5.0)
+            except queue.Empty:
+                job_id = None
+            if job_id is not None:
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                if job is not None:
+                    try:
+                        self._run_job(job)
+                    except Exception as e:
+                        self._set(job, state="failed", error=f"{e!r}")
+            if time.time() - self._last_spool_retry >= SPOOL_RETRY_SEC:
+                self._last_spool_retry = time.time()
+                self._retry_spool()
+
+    def stats(self):
+        with self._lock:
+            states = {}
+            for job in self._jobs.values():
+                states[job["state"]] = states.get(job["state"], 0) + 1
+        return {"jobs": states, "queued": self._queue.qsize(), "spooled": len(self.uploader.pending())}
+
+
+_QUEUES = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_job_queue(log_dir, upload_url, spool_dir=None):
+    """Process-wide worker per (log_dir, url), started on first use."""
+    key = (os.path.abspath(log_dir), upload_url)
+    with _QUEUES_LOCK:
+        jobs = _QUEUES.get(key)
+        if jobs is None:
+            jobs = _QUEUES[key] = ReportJobQueue(log_dir, upload_url, spool_dir)
+            jobs.start()
+        return jobs
@@ -0,0 +1,126 @@
+# PDF reports built entirely in memory.
+#
+# Every builder returns the finished PDF as bytes: the same buffer goes to
+# st.download_button and to the backend upload, and nothing is written to
+# the working directory, so two sessions exporting at once can't overwrite
+# each other's files. Charts are rendered to PNG in a BytesIO and handed to
+# ReportLab through ImageReader. Reports are built on the report worker
+# thread while Streamlit draws with pyplot, so figures here are plain
+# Figure objects on an Agg canvas and never touch pyplot's global registry.
+import io
+from datetime import datetime
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from downsample import CHART_DPI, downsample, target_points
+from focus_store import focused_mask, load_day
+from summary_index import day_summaries
+
+
+# ----- charts -----
+def new_figure(figsize):
+    # thread-safe stand-in for plt.subplots(): nothing registered globally
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def chart_image(fig, dpi=CHART_DPI):
+    """Figure -> ImageReader over an in-memory PNG."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    buf.seek(0)
+    return ImageReader(buf)
+
+
+def status_chart(status_counts):
+    fig, ax = new_figure(figsize=(6, 3))
+    ax.bar(status_counts["status"], status_counts["count"], color="#05917C")
+    ax.set_title("Status Breakdown")
+    ax.tick_params(axis="x", rotation=45)
+    return chart_image(fig)
+
+
+def focus_chart(df, method="lttb"):
+    fig, ax = new_figure(figsize=(6, 3))
+    x, y = downsample(df["timestamp"], df["focus_score"], target_points(6, dpi=CHART_DPI), method)
+    ax.plot(x, y, color="#00FF99")
+    ax.set_title("Focus Score Trend")
+    return chart_image(fig)
+
+
+# ----- builders -----
+def day_report(date, focus_pct, avg_score, status_counts, df, method="lttb"):
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+
+    # ---------- TEXT ----------
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(50, 820, "Study Focus Dashboard Report")
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, 790, f"Date: {date}")
+    c.drawString(50, 770, f"Time Focused: {focus_pct:.1f}%")
+    c.drawString(50, 750, f"Average Focus Score: {avg_score:.1f}")
+
+    # ---------- CHARTS ----------
+    c.drawImage(status_chart(status_counts), 50, 430, width=500, height=250)
+    c.drawImage(focus_chart(df, method), 50, 150, width=500, height=250)
+
+    c.save()
+    return buf.getvalue()
+
+
+def day_report_from_log(log_dir, date, method="lttb"):
+    """day_report() straight from the log files (used by the background jobs)."""
+    df = load_day(log_dir, date)
+    if df.empty:
+        return None
+    df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
+    focus_pct = focused_mask(df["status"]).sum() / len(df) * 100
+    status_counts = df["status"].value_counts().reset_index()
+    status_counts.columns = ["status", "count"]
+    return day_report(date, focus_pct, df["focus_score"].mean(), status_counts, df, method)
+
+
+def report_table(summary):
+    # per-day numbers as printed in the weekly / monthly PDFs
+    table = summary[["Date", "Focus %", "Avg Score", "Phone Events"]].copy()
+    table["Focus %"] = table["Focus %"].round(2)
+    table["Avg Score"] = table["Avg Score"].round(2)
+    return table.sort_values("Date")
+
+
+def table_report(title, table):
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(50, 800, title)
+    c.setFont("Helvetica", 12)
+    c.drawString(50, 770, "Date        Focus%       AvgScore       PhoneDetections")
+    y = 750
+    for _, row in table.iterrows():
+        c.drawString(50, y, f"{row['Date']}     {row['Focus %']}%           {row['Avg Score']}               {row['Phone Events']}")
+        y -= 20
+    c.save()
+    return buf.getvalue()
+
+
+def weekly_report(log_dir):
+    summary = day_summaries(log_dir)
+    if summary.empty:
+        return None
+    return table_report("📅 Weekly Study Focus Report", report_table(summary))
+
+
+def monthly_report(log_dir):
+    summary = day_summaries(log_dir)
+    this_month = datetime.now().strftime("%Y-%m-")
+    summary = summary[summary["Date"].str.startswith(this_month)]
+    if summary.empty:
+        return None
+    return table_report("📅 Monthly Study Focus Report", report_table(summary))
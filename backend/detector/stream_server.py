@@ -1,19 +1,33 @@
-from flask import Flask, Response, jsonify
+from flask import Flask, Response, jsonify, request
 import cv2
-import mediapipe as mp
-from ultralytics import YOLO
 import numpy as np
 import time
 import os
-import csv
-from datetime import datetime
+import threading
+
+from broadcast import FrameHub, parse_stream_params
+from detector_settings import (
+    PHONE_DETECT_EVERY_N, PHONE_DETECT_EVERY_N_ACTIVE, PHONE_MOTION_THRESHOLD, PHONE_DETECTOR_MODE,
+    PHONE_DETECTOR_IMGSZ, PHONE_DETECTOR_BACKEND, FACE_ROI_MARGIN, FACE_MAX_SIDE,
+    FACE_FULL_FRAME_EVERY, MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_STALE_SEC,
+)
+from face_tracker import RoiFaceMesh
+from focus_engine import STATUS_COLORS, STATUS_LABELS, FocusEngine, is_focused
+from focus_log import IntervalAggregator, start_log_writer
+from head_pose import head_pose_from_points
+from motion_gate import MotionGate
+from overlay import HudOverlay, draw_landmarks, landmark_edges
+from phone_detector import PhoneScheduler, create_phone_detector, draw_phone_boxes
+from pipeline import FramePipeline
 
 # ========= Settings =========
 ALERT_COOLDOWN_SEC = 3.0
 LOG_DIR = "focus_logs"
-FOCUS_MAX = 100
-FOCUS_MIN = 0
-AWAY_THRESHOLD = 10.0
+LOG_INTERVAL_SEC = 1.0           # one aggregated CSV row per this many seconds of wall time
+LOG_FORMAT = os.environ.get("FOCUS_LOG_FORMAT", "csv")  # csv / parquet / both
+CAMERA_INDEX = 0
+WARMUP_SHAPE = (480, 640, 3)     # blank frame pushed through the models once after loading
+LANDMARK_MODE = os.environ.get("LANDMARK_MODE", "contours")  # contours / oval / pose / off
 # ===========================
 
 app = Flask(__name__)
@@ -33,70 +47,32 @@ def play_alert():
         pass
     print("\a")
 
-# ----- CSV helpers -----
-def ensure_log_dir():
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-
-def today_csv_path():
-    ensure_log_dir()
-    fname = datetime.now().strftime("%Y-%m-%d") + ".csv"
-    return os.path.join(LOG_DIR, fname)
-
-def init_csv_if_needed():
-    path = today_csv_path()
-    if not os.path.exists(path):
-        with open(path, "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow([
-                "timestamp","status","gaze_status","faces_detected",
-                "phone_detected","focus_score"
-            ])
-
-def log_row(ts, status, gaze_status, faces_detected, phone_detected, focus_score):
-    init_csv_if_needed()
-    with open(today_csv_path(), "a", newline="") as f:
-        w = csv.writer(f)
-        w.writerow([ts, status, gaze_status, faces_detected, int(phone_detected), focus_score])
-
-# ===== Mediapipe + YOLO init =====
-mp_face_mesh = mp.solutions.face_mesh
-mp_drawing = mp.solutions.drawing_utils
-yolo_model = YOLO("yolov8n.pt")
-
-def get_head_pose(landmarks, img_shape):
-    h, w = img_shape
-    nose = np.array([landmarks[1].x * w, landmarks[1].y * h])
-    chin = np.array([landmarks[152].x * w, landmarks[152].y * h])
-    left_ear = np.array([landmarks[234].x * w, landmarks[234].y * h])
-    right_ear = np.array([landmarks[454].x * w, landmarks[454].y * h])
-
-    dy = chin[1] - nose[1]
-    dx = chin[0] - nose[0]
-    pitch_angle = np.degrees(np.arctan2(dy, dx))
-
-    dist_left = np.linalg.norm(nose - left_ear)
-    dist_right = np.linalg.norm(nose - right_ear)
-    yaw_ratio = dist_left / (dist_right + 1e-6)
-
-    if 0.7 < yaw_ratio < 1.3:
-        if -15 < pitch_angle < 15:
-            return "screen"
-        elif pitch_angle > 15:
-            return "notebook"
-        else:
-            return "away"
-    else:
-        return "away"
+# ----- CSV logging (one time-weighted row per LOG_INTERVAL_SEC, written by a background thread) -----
+log_writer = start_log_writer(LOG_DIR, log_format=LOG_FORMAT)
+log_aggregator = IntervalAggregator(LOG_INTERVAL_SEC)
+
+def log_sample(now, status, gaze_status, faces_detected, phone_detected, focus_score):
+    row = log_aggregator.add(now, status, gaze_status, faces_detected, phone_detected, focus_score)
+    if row is not None:
+        log_writer.log(row)
+
+# ===== Mediapipe + YOLO (loaded in the background, see load_models) =====
+mp_face_mesh = None
+face_mesh = None
+roi_face_mesh = None  # crops get their own video-mode FaceMesh (see RoiFaceMesh)
+face_tracker = None
+phone_detector = None
+phone_scheduler = None
+face_edges = None  # landmark index pairs for LANDMARK_MODE
 
 # ===== Global state =====
-cap = cv2.VideoCapture(0)
-focus_score = 100
-last_tick = time.time()
+cap = None
+focus_engine = FocusEngine()  # status + score rules (focus_engine.py)
 last_alert_time = 0.0
 sound_enabled = True
-frame_counter_for_log = 0
-look_away_start = None
+motion_gate = MotionGate(MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_STALE_SEC)
+last_result = ([], "away", False, [])  # faces, gaze, phone, phone boxes
+hud = HudOverlay()
 
 latest_payload = {
     "status": "Waiting...",
@@ -106,150 +82,270 @@ latest_payload = {
     "focus_score": 100
 }
 
-face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
-
-def generate_frames():
-    global focus_score, last_tick, last_alert_time, frame_counter_for_log, look_away_start, latest_payload
+def read_frame():
+    ret, frame = cap.read()
+    if not ret:
+        return StopIteration
+    return (time.time(), frame)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+def analyze_frame(item):
+    global last_alert_time, latest_payload
+    global last_result
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = face_mesh.process(rgb)
+    captured_at, frame = item
 
-        faces_detected = 0
+    # Models only run when the scene changed; otherwise reuse the last result
+    if motion_gate.check(frame, captured_at):
+        faces = face_tracker.process(frame)
         gaze_status = "away"
+        if len(faces) == 1:
+            gaze_status = head_pose_from_points(faces[0], frame.shape[:2])
 
-        if result.multi_face_landmarks:
-            faces_detected = len(result.multi_face_landmarks)
-            if faces_detected == 1:
-                landmarks = result.multi_face_landmarks[0].landmark
-                gaze_status = get_head_pose(landmarks, frame.shape[:2])
-                mp_drawing.draw_landmarks(
-                    frame,
-                    result.multi_face_landmarks[0],
-                    mp_face_mesh.FACEMESH_CONTOURS
-                )
-
-        # Phone detection
-        phone_detected = False
-        results = yolo_model(frame, verbose=False)
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                if r.names[cls] == "cell phone" and conf > 0.5:
-                    phone_detected = True
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    cv2.putText(frame, "Phone", (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-        # away timer
-        if gaze_status == "away":
-            if look_away_start is None:
-                look_away_start = time.time()
-        else:
-            look_away_start = None
-
-        away_long_enough = False
-        if look_away_start is not None:
-            if time.time() - look_away_start >= AWAY_THRESHOLD:
-                away_long_enough = True
-
-        # STATUS
-        if faces_detected != 1:
-            status = "Not Focused (Multiple/No Face)"
-            color = (0, 0, 255)
-        elif phone_detected:
-            status = "Not Focused (Phone Detected)"
-            color = (0, 0, 255)
-        elif gaze_status in ["screen", "notebook"]:
-            status = f"Focused ({gaze_status})"
-            color = (0, 255, 0)
-        elif away_long_enough:
-            status = "Not Focused (Looking Away >10s)"
-            color = (0, 0, 255)
-        else:
-            status = "Focused (temporary glance away)"
-            color = (0, 255, 255)
-
-        # Focus score update
-        now = time.time()
-        dt = now - last_tick
-        if dt < 0: dt = 0
-        last_tick = now
-
-        if status.startswith("Focused (screen)") or status.startswith("Focused (notebook)"):
-            focus_score += int(+20 * dt)
-        elif "temporary glance" in status:
-            focus_score += int(+5 * dt)
-        elif "Phone Detected" in status:
-            focus_score -= int(25 * dt)
-        else:
-            focus_score -= int(15 * dt)
-
-        focus_score = max(FOCUS_MIN, min(FOCUS_MAX, focus_score))
-
-        # Sound alert
-        if (("Not Focused" in status) or phone_detected) and sound_enabled:
-            if (now - last_alert_time) >= ALERT_COOLDOWN_SEC:
-                play_alert()
-                last_alert_time = now
-
-        # CSV logging ~1 sec
-        frame_counter_for_log += 1
-        if frame_counter_for_log >= 30:
-            frame_counter_for_log = 0
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_row(ts, status, gaze_status, faces_detected, phone_detected, focus_score)
-
-        # update latest payload
-        latest_payload = {
-            "status": status,
-            "gaze_status": gaze_status,
-            "faces_detected": faces_detected,
-            "phone_detected": phone_detected,
-            "focus_score": focus_score
-        }
-
-                # draw overlay
-        cv2.putText(frame, status, (30, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 3)
-
-        cv2.putText(frame, f"Focus Score: {focus_score}/100", (30, 90),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
-
-        bar_x, bar_y, bar_w, bar_h = 30, 110, 300, 20
-        cv2.rectangle(frame, (bar_x, bar_y),
-                      (bar_x + bar_w, bar_y + bar_h),
-                      (200, 200, 200), 2)
-
-        fill_w = int(bar_w * (focus_score / 100.0))
-        cv2.rectangle(frame, (bar_x, bar_y),
-                      (bar_x + fill_w, bar_y + bar_h),
-                      (0, 255, 0), -1)
-
-        # encode to jpg
-        ret, buffer = cv2.imencode(".jpg", frame)
-        frame_bytes = buffer.tobytes()
-
+        # Phone detection (YOLO every few frames, tracked in between)
+        phone_detected, phone_boxes = phone_scheduler.update(frame)
+        last_result = (faces, gaze_status, phone_detected, phone_boxes)
+    else:
+        faces, gaze_status, phone_detected, phone_boxes = last_result
+
+    faces_detected = len(faces)
+    if faces_detected == 1:
+        draw_landmarks(frame, faces[0], LANDMARK_MODE, face_edges)
+    draw_phone_boxes(frame, phone_boxes)
+
+    # status + score; clocked by the capture time, so the score moves at the
+    # same per-second rate whatever the frame rate
+    code, focus_score = focus_engine.update(captured_at, faces_detected, gaze_status, phone_detected)
+    status, color = STATUS_LABELS[code], STATUS_COLORS[code]
+
+    # Sound alert
+    now = time.time()
+    if (not is_focused(code) or phone_detected) and sound_enabled:
+        if (now - last_alert_time) >= ALERT_COOLDOWN_SEC:
+            play_alert()
+            last_alert_time = now
+
+    # CSV logging (time-based, independent of FPS)
+    log_sample(now, status, gaze_status, faces_detected, phone_detected, focus_score)
+
+    # update latest payload
+    latest_payload = {
+        "status": status,
+        "gaze_status": gaze_status,
+        "faces_detected": faces_detected,
+        "phone_detected": phone_detected,
+        "focus_score": focus_score
+    }
+
+    # draw overlay (cached HUD layer, only changed text is re-rendered)
+    hud.draw(frame, status, color, focus_score)
+
+    return (captured_at, frame, latest_payload)
+
+next_due = {}  # StreamParams -> when its next encode is due (for the fps cap)
+
+def fps_due(params, now):
+    """fps cap: True if `params` should get this frame.
+
+    Keeps a due time per variant that advances by exactly 1/fps, and accepts
+    a frame up to half a period early, so capture jitter doesn't make it skip
+    frames (a strict "now - last >= 1/fps" check delivers well under fps).
+    Resyncs when it has fallen more than a period behind.
+    """
+    period = 1.0 / params.fps
+    due = next_due.get(params)
+    if due is not None and now < due - 0.5 * period:
+        return False
+    next_due[params] = now + period if due is None or now - due >= period else due + period
+    return True
+
+def encode_frame(item):
+    # one JPEG per stream variant someone is watching; none at all if nobody is
+    captured_at, frame, payload = item
+    resized = {}
+    jpegs = {}
+    for params in hub.active_streams():
+        if params.fps and not fps_due(params, captured_at):
+            continue
+        img = frame
+        if params.max_width and frame.shape[1] > params.max_width:
+            img = resized.get(params.max_width)
+            if img is None:
+                h = round(frame.shape[0] * params.max_width / frame.shape[1])
+                img = cv2.resize(frame, (params.max_width, h), interpolation=cv2.INTER_AREA)
+                resized[params.max_width] = img
+        ret, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, params.quality])
+        if ret:
+            jpegs[params] = buffer.tobytes()
+    return (captured_at, jpegs, payload)
+
+# ===== Shared analysis loop =====
+# One pipeline feeds one hub; every /video_feed and /analysis client reads
+# from the hub, so extra viewers cost no extra inference.
+hub = FrameHub(latest_payload)
+pipeline = None
+pipeline_lock = threading.Lock()
+
+# loading -> ready <-> paused; "error" if the models could not be loaded
+engine_state = "loading"
+engine_error = None
+models_loaded = threading.Event()
+pause_requested = False  # set by pause(); stops the auto-start after loading too
+
+def load_models():
+    """Import + build FaceMesh and the phone detector, then warm both up.
+
+    Runs in a background thread so Flask binds the port immediately; the
+    warm-up pass means the first real frame doesn't pay for lazy graph setup.
+    """
+    global mp_face_mesh, face_mesh, roi_face_mesh, face_tracker, phone_detector, phone_scheduler, face_edges
+    global engine_state, engine_error
+    try:
+        t0 = time.time()
+        import mediapipe as mp
+        mp_face_mesh = mp.solutions.face_mesh
+        face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
+        roi_face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
+        face_tracker = RoiFaceMesh(
+            face_mesh,
+            roi_face_mesh,
+            margin=FACE_ROI_MARGIN,
+            max_side=FACE_MAX_SIDE,
+            full_frame_every=FACE_FULL_FRAME_EVERY,
+        )
+        face_edges = landmark_edges(LANDMARK_MODE)
+        phone_detector = create_phone_detector(PHONE_DETECTOR_BACKEND, mode=PHONE_DETECTOR_MODE, imgsz=PHONE_DETECTOR_IMGSZ)
+        phone_scheduler = PhoneScheduler(
+            phone_detector,
+            idle_every_n=PHONE_DETECT_EVERY_N,
+            active_every_n=PHONE_DETECT_EVERY_N_ACTIVE,
+            motion_threshold=PHONE_MOTION_THRESHOLD,
+        )
+
+        blank = np.zeros(WARMUP_SHAPE, dtype=np.uint8)
+        face_mesh.process(blank)
+        roi_face_mesh.process(blank)
+        phone_detector(blank)
+        print(f"Models ready in {time.time() - t0:.1f}s")
+        with pipeline_lock:
+            models_loaded.set()
+            # a pause that came in while loading wins over the auto-start
+            if pause_requested:
+                engine_state = "paused"
+            elif _ensure_pipeline_locked() is not None:
+                engine_state = "ready"
+    except Exception as e:
+        engine_error = str(e)
+        engine_state = "error"
+        print("Model loading failed:", e)
+
+def _ensure_pipeline_locked():
+    global pipeline, cap
+    if not models_loaded.is_set() or pause_requested:
+        return None
+    if pipeline is None or not pipeline.is_running():
+        if pipeline is not None:
+            # a stage died: stop what is left before starting a fresh one
+            pipeline.stop()
+            pipeline.join(timeout=2.0)
+        if cap is None or not cap.isOpened():
+            cap = cv2.VideoCapture(CAMERA_INDEX)
+        hub.reopen()
+        pipeline = FramePipeline(read_frame, analyze_frame, encode_frame, sink=hub).start()
+    return pipeline
+
+def ensure_pipeline():
+    with pipeline_lock:
+        return _ensure_pipeline_locked()
+
+def pause():
+    # stop the loop and free the camera, but keep the models in memory
+    global pipeline, cap, engine_state, pause_requested
+    with pipeline_lock:
+        pause_requested = True
+        if pipeline is not None:
+            pipeline.stop()
+            pipeline.join(timeout=2.0)
+            pipeline = None
+        hub.close()
+        if cap is not None:
+            cap.release()
+            cap = None
+        if models_loaded.is_set():
+            engine_state = "paused"
+
+def resume():
+    # also valid while loading: clears an earlier pause so loading ends in "ready"
+    global engine_state, pause_requested
+    with pipeline_lock:
+        pause_requested = False
+        if _ensure_pipeline_locked() is not None:
+            engine_state = "ready"
+
+def generate_frames(params):
+    ensure_pipeline()
+    for frame_bytes in hub.subscribe(params):
         yield (b"--frame\r\n"
                b"Content-Type: image/jpeg\r\n\r\n" + frame_bytes + b"\r\n")
 
+def engine_status():
+    return {
+        "state": engine_state,
+        "ready": engine_state == "ready",
+        "error": engine_error,
+    }
+
 @app.route("/video_feed")
 def video_feed():
-    return Response(generate_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+    if engine_state != "ready":
+        return jsonify(engine_status()), 503
+    # optional ?w=<max width>&q=<jpeg quality>&fps=<max fps>
+    params = parse_stream_params(request.args)
+    return Response(generate_frames(params), mimetype="multipart/x-mixed-replace; boundary=frame")
 
 @app.route("/analysis")
 def analysis():
-    return jsonify(latest_payload)
+    payload = hub.latest_payload()
+    payload.update(engine_status())
+    return jsonify(payload)
+
+@app.route("/control/pause", methods=["POST"])
+def control_pause():
+    pause()
+    return jsonify(engine_status())
+
+@app.route("/control/resume", methods=["POST"])
+def control_resume():
+    if engine_state in ("paused", "loading"):
+        resume()
+    return jsonify(engine_status())
+
+@app.route("/control/status")
+def control_status():
+    return jsonify(engine_status())
+
+def collect_stats():
+    if pipeline is None:
+        return {"running": False}
+    stats = pipeline.stats()
+    stats["running"] = pipeline.is_running()
+    stats["hub"] = hub.stats()
+    if phone_scheduler is not None:
+        stats["phone_scheduler"] = phone_scheduler.stats()
+    if face_tracker is not None:
+        stats["face_tracker"] = face_tracker.stats()
+    stats["motion_gate"] = motion_gate.stats()
+    stats["overlay"] = hud.stats()
+    stats["log_writer"] = log_writer.stats()
+    return stats
+
+@app.route("/pipeline_stats")
+def pipeline_stats():
+    return jsonify(collect_stats())
 
 # if __name__ == "__main__":
 #     app.run(host="0.0.0.0", port=5001, debug=True)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, debug=False, use_reloader=False)
+    threading.Thread(target=load_models, name="model-loader", daemon=True).start()
+    app.run(host="0.0.0.0", port=5001, debug=False, use_reloader=False, threaded=True)
 
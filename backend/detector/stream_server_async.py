@@ -0,0 +1,257 @@
+# asyncio front end for the stream server (aiohttp).
+#
+# Same engine as stream_server.py - model loading, the capture/analyze/encode
+# pipeline and the FrameHub are imported from there unchanged - but clients
+# are served from one event loop instead of one Werkzeug thread each:
+#   /video_feed      MJPEG, written with async writes
+#   /analysis        latest payload (same JSON as the Flask server)
+#   /events          Server-Sent Events push of the analysis payload
+#   /ws              the same push over a WebSocket
+#   /control/...     pause / resume / status, /pipeline_stats
+#
+# Run: python stream_server_async.py [--port 5001]
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+from aiohttp import web, WSMsgType
+
+import stream_server as engine
+from broadcast import parse_stream_params
+
+ANALYSIS_PUSH_HZ = 10.0   # max analysis pushes per second per client
+HEARTBEAT_SEC = 15.0      # SSE comment / WS ping so proxies keep the connection
+
+
+def to_json(obj):
+    # numpy scalars (np.bool_ from the detector) -> plain Python
+    return json.dumps(obj, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+# ----- FrameHub -> event loop bridge -----
+class AsyncHub:
+    """Mirrors the engine's FrameHub into the event loop.
+
+    One thread blocks on the hub and hands every new frame to the loop;
+    async subscribers then wait on an asyncio.Event, so a viewer costs a
+    coroutine, not a thread.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.seq = 0
+        self.frames = {}  # StreamParams -> (seq, jpeg), as in FrameHub
+        self.payload = hub.latest_payload()
+        self.subscribers = 0
+        self._loop = None
+        self._changed = None
+
+    def start(self, loop):
+        self._loop = loop
+        self._changed = asyncio.Event()
+        threading.Thread(target=self._pump, name="async-hub", daemon=True).start()
+
+    def _pump(self):
+        last = self.hub.seq
+        while True:
+            seq, _, payload = self.hub.wait_next(last, timeout=1.0)
+            if seq == last:
+                if self.hub.closed:
+                    time.sleep(0.2)  # paused: wait_next returns at once
+                continue
+            last = seq
+            frames = self.hub.frames_snapshot()
+            self._loop.call_soon_threadsafe(self._publish, seq, frames, payload)
+
+    def _publish(self, seq, frames, payload):
+        self.seq, self.frames, self.payload = seq, frames, payload
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_next(self, last_seq, timeout=1.0):
+        """True once there is a frame newer than last_seq (False on timeout)."""
+        if self.seq > last_seq:
+            return True
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.seq > last_seq
+
+
+async_hub = AsyncHub(engine.hub)
+routes = web.RouteTableDef()
+
+
+def analysis_payload():
+    payload = dict(async_hub.payload)
+    payload.update(engine.engine_status())
+    return payload
+
+
+async def analysis_updates(min_interval=1.0 / ANALYSIS_PUSH_HZ):
+    """Async generator of analysis payloads: on change, rate-limited, None as heartbeat.
+
+    The heartbeat goes out HEARTBEAT_SEC after the last thing yielded, also
+    while frames keep coming with an unchanged payload (nothing else would be
+    written then).
+    """
+    last_seq = -1
+    last_sent = None
+    last_push = 0.0
+    last_write = time.monotonic()  # the caller has just sent the current payload
+    while True:
+        quiet = time.monotonic() - last_write
+        if quiet >= HEARTBEAT_SEC:
+            last_write = time.monotonic()
+            yield None
+            continue
+        if not await async_hub.wait_next(last_seq, timeout=HEARTBEAT_SEC - quiet):
+            continue
+        wait = min_interval - (time.monotonic() - last_push)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        last_seq = async_hub.seq
+        payload = analysis_payload()
+        if payload != last_sent:
+            last_sent = payload
+            last_push = last_write = time.monotonic()
+            yield payload
+
+
+# ----- routes -----
+@routes.get("/video_feed")
+async def video_feed(request):
+    if engine.engine_state != "ready":
+        return web.json_response(engine.engine_status(), status=503, dumps=to_json)
+    await asyncio.get_running_loop().run_in_executor(None, engine.ensure_pipeline)
+
+    resp = web.StreamResponse(headers={
+        "Content-Type": "multipart/x-mixed-replace; boundary=frame",
+        "Cache-Control": "no-cache",
+    })
+    await resp.prepare(request)
+    # ?w=&q=&fps= pick the variant; the encoder only makes variants somebody watches
+    params = parse_stream_params(request.query)
+    engine.hub.add_stream(params)
+    async_hub.subscribers += 1
+    try:
+        last_seq = async_hub.seq    # hub-wide sequence we have seen
+        last_frame = async_hub.frames.get(params, (0, None))[0]
+        while engine.engine_state == "ready":
+            if not await async_hub.wait_next(last_seq):
+                continue
+            last_seq = async_hub.seq
+            seq, jpeg = async_hub.frames.get(params, (0, None))
+            if seq <= last_frame:
+                continue  # fps-capped variant: not encoded this time
+            last_frame = seq
+            await resp.write(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n")
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        async_hub.subscribers -= 1
+        engine.hub.remove_stream(params)
+    return resp
+
+
+@routes.get("/analysis")
+async def analysis(request):
+    return web.json_response(analysis_payload(), dumps=to_json)
+
+
+@routes.get("/events")
+async def events(request):
+    resp = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "Access-Control-Allow-Origin": "*",
+    })
+    await resp.prepare(request)
+    try:
+        await resp.write(f"data: {to_json(analysis_payload())}\n\n".encode())
+        async for payload in analysis_updates():
+            if payload is None:
+                await resp.write(b": keep-alive\n\n")
+            else:
+                await resp.write(f"data: {to_json(payload)}\n\n".encode())
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    return resp
+
+
+@routes.get("/ws")
+async def ws(request):
+    sock = web.WebSocketResponse(heartbeat=HEARTBEAT_SEC)
+    await sock.prepare(request)
+
+    async def push():
+        await sock.send_str(to_json(analysis_payload()))
+        async for payload in analysis_updates():
+            if payload is not None:  # keep-alive on a WebSocket is the protocol ping (heartbeat=)
+                await sock.send_str(to_json(payload))
+
+    pusher = asyncio.ensure_future(push())
+    try:
+        # the client only needs to listen; anything it sends is ignored
+        async for msg in sock:
+            if msg.type == WSMsgType.ERROR:
+                break
+    finally:
+        pusher.cancel()
+    return sock
+
+
+# pause / resume join threads and open the camera: keep them off the loop
+@routes.post("/control/pause")
+async def control_pause(request):
+    await asyncio.get_running_loop().run_in_executor(None, engine.pause)
+    return web.json_response(engine.engine_status())
+
+
+@routes.post("/control/resume")
+async def control_resume(request):
+    if engine.engine_state in ("paused", "loading"):
+        await asyncio.get_running_loop().run_in_executor(None, engine.resume)
+    return web.json_response(engine.engine_status())
+
+
+@routes.get("/control/status")
+async def control_status(request):
+    return web.json_response(engine.engine_status())
+
+
+@routes.get("/pipeline_stats")
+async def pipeline_stats(request):
+    stats = engine.collect_stats()
+    stats["async_subscribers"] = async_hub.subscribers
+    return web.json_response(stats, dumps=to_json)
+
+
+async def on_startup(app):
+    async_hub.start(asyncio.get_running_loop())
+
+
+async def on_shutdown(app):
+    await asyncio.get_running_loop().run_in_executor(None, engine.pause)
+
+
+def create_app():
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    return app
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=5001)
+    args = ap.parse_args()
+
+    threading.Thread(target=engine.load_models, name="model-loader", daemon=True).start()
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -1,17 +1,26 @@
 import cv2
 import mediapipe as mp
-from ultralytics import YOLO
-import numpy as np
 import time
 import os
-import csv
-from datetime import datetime
+
+from detector_settings import (
+    PHONE_DETECT_EVERY_N, PHONE_DETECT_EVERY_N_ACTIVE, PHONE_MOTION_THRESHOLD, PHONE_DETECTOR_MODE,
+    PHONE_DETECTOR_IMGSZ, PHONE_DETECTOR_BACKEND, FACE_ROI_MARGIN, FACE_MAX_SIDE,
+    FACE_FULL_FRAME_EVERY,
+)
+from face_tracker import RoiFaceMesh
+from focus_engine import STATUS_COLORS, STATUS_LABELS, FocusEngine, is_focused
+from focus_log import IntervalAggregator, start_log_writer
+from head_pose import head_pose_from_points
+from overlay import HudOverlay, draw_landmarks, landmark_edges
+from phone_detector import PhoneScheduler, create_phone_detector, draw_phone_boxes
 
 # ========= Settings you can tweak =========
 ALERT_COOLDOWN_SEC = 3.0     # ek alert ke baad kitni der chup rahe
 LOG_DIR = "focus_logs"       # CSV folder
-FOCUS_MAX = 100
-FOCUS_MIN = 0
+LOG_INTERVAL_SEC = 1.0       # one aggregated CSV row per this many seconds of wall time
+LOG_FORMAT = os.environ.get("FOCUS_LOG_FORMAT", "csv")  # csv / parquet / both
+LANDMARK_MODE = os.environ.get("LANDMARK_MODE", "contours")  # contours / oval / pose / off
 # =========================================
 
 # ----- Sound helper (cross-platform best effort) -----
@@ -32,190 +41,80 @@ def play_alert():
     # Terminal bell as fallback
     print("\a")
 
-# ----- CSV helpers -----
-def ensure_log_dir():
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-
-def today_csv_path():
-    ensure_log_dir()
-    fname = datetime.now().strftime("%Y-%m-%d") + ".csv"
-    return os.path.join(LOG_DIR, fname)
-
-def init_csv_if_needed():
-    path = today_csv_path()
-    if not os.path.exists(path):
-        with open(path, "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow([
-                "timestamp","status","gaze_status","faces_detected",
-                "phone_detected","focus_score"
-            ])
-
-def log_row(ts, status, gaze_status, faces_detected, phone_detected, focus_score):
-    init_csv_if_needed()
-    with open(today_csv_path(), "a", newline="") as f:
-        w = csv.writer(f)
-        w.writerow([ts, status, gaze_status, faces_detected, int(phone_detected), focus_score])
+# ----- CSV logging (one time-weighted row per LOG_INTERVAL_SEC, written by a background thread) -----
+log_writer = start_log_writer(LOG_DIR, log_format=LOG_FORMAT)
+log_aggregator = IntervalAggregator(LOG_INTERVAL_SEC)
+
+def log_sample(now, status, gaze_status, faces_detected, phone_detected, focus_score):
+    row = log_aggregator.add(now, status, gaze_status, faces_detected, phone_detected, focus_score)
+    if row is not None:
+        log_writer.log(row)
 
 # ====== YOUR ORIGINAL CODE STARTS (kept same) ======
 mp_face_mesh = mp.solutions.face_mesh
-mp_drawing = mp.solutions.drawing_utils
-yolo_model = YOLO("yolov8n.pt")
-
-def get_head_pose(landmarks, img_shape):
-    h, w = img_shape
-    nose = np.array([landmarks[1].x * w, landmarks[1].y * h])
-    chin = np.array([landmarks[152].x * w, landmarks[152].y * h])
-    left_ear = np.array([landmarks[234].x * w, landmarks[234].y * h])
-    right_ear = np.array([landmarks[454].x * w, landmarks[454].y * h])
-
-    dy = chin[1] - nose[1]
-    dx = chin[0] - nose[0]
-    pitch_angle = np.degrees(np.arctan2(dy, dx))
-
-    dist_left = np.linalg.norm(nose - left_ear)
-    dist_right = np.linalg.norm(nose - right_ear)
-    yaw_ratio = dist_left / (dist_right + 1e-6)
-
-    if 0.7 < yaw_ratio < 1.3:
-        if -15 < pitch_angle < 15:
-            return "screen"
-        elif pitch_angle > 15:
-            return "notebook"
-        else:
-            return "away"
-    else:
-        return "away"
+phone_detector = create_phone_detector(PHONE_DETECTOR_BACKEND, mode=PHONE_DETECTOR_MODE, imgsz=PHONE_DETECTOR_IMGSZ)
+phone_scheduler = PhoneScheduler(
+    phone_detector,
+    idle_every_n=PHONE_DETECT_EVERY_N,
+    active_every_n=PHONE_DETECT_EVERY_N_ACTIVE,
+    motion_threshold=PHONE_MOTION_THRESHOLD,
+)
 
 cap = cv2.VideoCapture(0)
-
-look_away_start = None
-AWAY_THRESHOLD = 10.0
 # ====== YOUR ORIGINAL CODE ENDS (logic below only adds features) ======
 
 # ---- New: focus score + alerts state ----
-focus_score = 100
-last_tick = time.time()
+focus_engine = FocusEngine()  # status + score rules live in focus_engine.py
 last_alert_time = 0.0
 sound_enabled = True  # press 's' to toggle
-frame_counter_for_log = 0  # log every ~10 frames (~0.3s) -> later throttled to 1s
 
-with mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2) as face_mesh:
+# HUD is cached, only the text that changed gets re-rendered
+hud = HudOverlay(hint="[Q] Quit   [S] Sound On/Off   [R] Reset Score")
+face_edges = landmark_edges(LANDMARK_MODE)
+
+# full frames and ROI crops each get their own FaceMesh (video mode keeps per-instance state)
+with mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2) as face_mesh, \
+        mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2) as roi_face_mesh:
+    face_tracker = RoiFaceMesh(
+        face_mesh,
+        roi_face_mesh,
+        margin=FACE_ROI_MARGIN,
+        max_side=FACE_MAX_SIDE,
+        full_frame_every=FACE_FULL_FRAME_EVERY,
+    )
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = face_mesh.process(rgb)
-
-        faces_detected = 0
+        faces = face_tracker.process(frame)
+        faces_detected = len(faces)
         gaze_status = "away"
 
-        if result.multi_face_landmarks:
-            faces_detected = len(result.multi_face_landmarks)
-            if faces_detected == 1:
-                landmarks = result.multi_face_landmarks[0].landmark
-                gaze_status = get_head_pose(landmarks, frame.shape[:2])
-                mp_drawing.draw_landmarks(
-                    frame,
-                    result.multi_face_landmarks[0],
-                    mp_face_mesh.FACEMESH_CONTOURS
-                )
-
-        # Phone detection (YOLO)
-        phone_detected = False
-        results = yolo_model(frame, verbose=False)
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                if r.names[cls] == "cell phone" and conf > 0.5:
-                    phone_detected = True
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    cv2.putText(frame, "Phone", (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-        # away timer
-        if gaze_status == "away":
-            if look_away_start is None:
-                look_away_start = time.time()
-        else:
-            look_away_start = None  # reset when back to focus
-
-        away_long_enough = False
-        if look_away_start is not None:
-            if time.time() - look_away_start >= AWAY_THRESHOLD:
-                away_long_enough = True
-
-        # ---- STATUS (same branches, just extended) ----
-        if faces_detected != 1:
-            status = "Not Focused (Multiple/No Face)"
-            color = (0, 0, 255)
-        elif phone_detected:
-            status = "Not Focused (Phone Detected)"
-            color = (0, 0, 255)
-        elif gaze_status in ["screen", "notebook"]:
-            status = f"Focused ({gaze_status})"
-            color = (0, 255, 0)
-        elif away_long_enough:
-            status = "Not Focused (Looking Away >10qs)"
-            color = (0, 0, 255)
-        else:
-            status = "Focused (temporary glance away)"
-            color = (0, 255, 255)
-
-        # ---- Focus score update (time-based) ----
+        if faces_detected == 1:
+            gaze_status = head_pose_from_points(faces[0], frame.shape[:2])
+            draw_landmarks(frame, faces[0], LANDMARK_MODE, face_edges)
+
+        # Phone detection (YOLO every few frames, tracked in between)
+        phone_detected, phone_boxes = phone_scheduler.update(frame)
+        draw_phone_boxes(frame, phone_boxes)
+
+        # ---- STATUS + focus score (per-second rates, same at any FPS) ----
         now = time.time()
-        dt = now - last_tick
-        if dt < 0: dt = 0
-        last_tick = now
-
-        # score rules per second (scaled by dt)
-        if status.startswith("Focused (screen)") or status.startswith("Focused (notebook)"):
-            focus_score += int( +20 * dt)   # recover faster while focused
-        elif "temporary glance" in status:
-            focus_score += int( +5 * dt)    # slight positive
-        elif "Phone Detected" in status:
-            focus_score -= int( 25 * dt)
-        else:
-            # other not-focused states
-            focus_score -= int( 15 * dt)
-
-        focus_score = max(FOCUS_MIN, min(FOCUS_MAX, focus_score))
+        code, focus_score = focus_engine.update(now, faces_detected, gaze_status, phone_detected)
+        status, color = STATUS_LABELS[code], STATUS_COLORS[code]
 
         # ---- Sound alert (rate-limited) ----
-        if (("Not Focused" in status) or phone_detected) and sound_enabled:
+        if (not is_focused(code) or phone_detected) and sound_enabled:
             if (now - last_alert_time) >= ALERT_COOLDOWN_SEC:
                 play_alert()
                 last_alert_time = now
 
-        # ---- CSV logging (1 row per second approx) ----
-        frame_counter_for_log += 1
-        if frame_counter_for_log >= 30:  # ~30 fps -> 1 sec
-            frame_counter_for_log = 0
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_row(ts, status, gaze_status, faces_detected, phone_detected, focus_score)
-
-        # ---- On-frame UI ----
-        cv2.putText(frame, status, (30, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 3)
-
-        # Focus score text
-        cv2.putText(frame, f"Focus Score: {focus_score}/100", (30, 90),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
-
-        # Progress bar for score
-        bar_x, bar_y, bar_w, bar_h = 30, 110, 300, 20
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (200,200,200), 2)
-        fill_w = int(bar_w * (focus_score / 100.0))
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + fill_w, bar_y + bar_h), (0, 255, 0), -1)
+        # ---- CSV logging (1 time-weighted row per LOG_INTERVAL_SEC) ----
+        log_sample(now, status, gaze_status, faces_detected, phone_detected, focus_score)
 
-        # Hints
-        cv2.putText(frame, "[Q] Quit   [S] Sound On/Off   [R] Reset Score", (30, 150),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1)
+        # ---- On-frame UI (status, score text + bar, hints) ----
+        hud.draw(frame, status, color, focus_score)
 
         cv2.imshow("Study Monitor", frame)
 
@@ -225,7 +124,8 @@ with mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2) as face_mesh:
         elif key == ord("s"):
             sound_enabled = not sound_enabled
         elif key == ord("r"):
-            focus_score = 100
+            focus_engine.reset()
 
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
+log_writer.close()
\ No newline at end of file
@@ -0,0 +1,108 @@
+# Persistent per-day summary of the focus logs (SQLite sidecar in LOG_DIR).
+#
+# Each day is keyed by the name / mtime / size of the files backing it, so a
+# refresh only re-reads days whose files changed - normally just today.
+import os
+import json
+import sqlite3
+
+import pandas as pd
+
+from focus_store import available_dates, focused_mask, load_day, source_files
+
+INDEX_NAME = ".summary.sqlite"
+SUMMARY_COLUMNS = ["status", "focus_score", "phone_detected"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_summary (
+    date TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    focused_rows INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    phone_events INTEGER NOT NULL
+)
+"""
+
+
+def index_path(log_dir):
+    return os.path.join(log_dir, INDEX_NAME)
+
+
+def _connect(log_dir):
+    os.makedirs(log_dir, exist_ok=True)
+    conn = sqlite3.connect(index_path(log_dir))
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _signature(files):
+    sig = []
+    for path in files:
+        st = os.stat(path)
+        sig.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+    return json.dumps(sig)
+
+
+def summarize_day(log_dir, date):
+    df = load_day(log_dir, date, SUMMARY_COLUMNS)
+    rows = len(df)
+    if not rows:
+        return 0, 0, 0.0, 0
+    return (
+        rows,
+        int(focused_mask(df["status"]).sum()),
+        float(df["focus_score"].sum()),
+        int(df["phone_detected"].sum()),
+    )
+
+
+def refresh_index(log_dir):
+    """Bring the index up to date; returns the dates that had to be re-read."""
+    conn = _connect(log_dir)
+    try:
+        known = dict(conn.execute("SELECT date, signature FROM day_summary"))
+        dates = available_dates(log_dir)
+        refreshed = []
+        for date in dates:
+            files = source_files(log_dir, date)
+            if not files:
+                continue
+            sig = _signature(files)
+            if known.get(date) == sig:
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO day_summary VALUES (?, ?, ?, ?, ?, ?)",
+                (date, sig) + summarize_day(log_dir, date),
+            )
+            refreshed.append(date)
+        gone = set(known) - set(dates)
+        conn.executemany("DELETE FROM day_summary WHERE date = ?", [(d,) for d in gone])
+        conn.commit()
+        return refreshed
+    finally:
+        conn.close()
+
+
+def day_summaries(log_dir, refresh=True):
+    """DataFrame with one row per day: Date, Records, Focus %, Avg Score, Phone Events."""
+    if refresh:
+        refresh_index(log_dir)
+    conn = _connect(log_dir)
+    try:
+        rows = conn.execute(
+            "SELECT date, rows, focused_rows, score_sum, phone_events FROM day_summary ORDER BY date"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    out = []
+    for date, n, focused, score_sum, phone in rows:
+        out.append([
+            date,
+            n,
+            (focused / n * 100) if n else 0,
+            (score_sum / n) if n else 0,
+            phone,
+        ])
+    return pd.DataFrame(out, columns=["Date", "Records", "Focus %", "Avg Score", "Phone Events"])
@@ -1,41 +1,177 @@
-import base64
-import io
-import numpy as np
-from PIL import Image
+import sys
 import cv2
 import json
 import time
 import os
 import csv
+import queue
+import threading
 from datetime import datetime
 import mediapipe as mp
-from ultralytics import YOLO
 from flask import Flask
-from flask_socketio import SocketIO, emit
+from flask import request
+from flask_socketio import SocketIO
+
+# shared detector helpers live next to the backend stream server
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "detector"))
+from detector_settings import (
+    PHONE_DETECT_EVERY_N, PHONE_DETECT_EVERY_N_ACTIVE, PHONE_MOTION_THRESHOLD, PHONE_DETECTOR_MODE,
+    PHONE_DETECTOR_IMGSZ, PHONE_DETECTOR_BACKEND, FACE_ROI_MARGIN, FACE_MAX_SIDE,
+    FACE_FULL_FRAME_EVERY, MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_STALE_SEC,
+)
+from face_tracker import RoiFaceMesh
+from focus_engine import STATUS_LABELS, FocusEngine, is_focused
+from frame_codec import decode_frame
+from head_pose import head_pose_from_points
+from motion_gate import MotionGate
+from phone_detector import PhoneScheduler, create_phone_detector
 
 # ========= CONFIG =========
 ALERT_COOLDOWN_SEC = 3.0
 LOG_DIR = "focus_logs"
-FOCUS_MAX = 100
-FOCUS_MIN = 0
-AWAY_THRESHOLD = 10.0
+FRAME_WORKERS = int(os.environ.get("FRAME_WORKERS", min(2, os.cpu_count() or 1)))  # model sets / frames analyzed in parallel
+# each worker holds its own YOLO + FaceMesh, so keep the worker count small
+# and split the cores between them instead of every library using all of them
+THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // max(1, FRAME_WORKERS))
 # ==========================
 
 # ===== Flask Socket Setup =====
 app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# real threads: the frame workers emit from outside the request context
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
 
 # ===== Models =====
 mp_face_mesh = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
-face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
-yolo_model = YOLO("yolov8n.pt")
 
-# ===== State Vars =====
-look_away_start = None
-focus_score = 100
-last_alert_time = 0.0
-sound_enabled = True
+
+# ===== Per-client state =====
+class ClientSession:
+    """Everything that used to be a module global, one per connected student."""
+
+    def __init__(self, sid, worker):
+        self.sid = sid
+        self.worker = worker
+        self.focus_engine = FocusEngine()  # same status / score rules as the backend
+        self.last_alert_time = 0.0
+        self.motion_gate = MotionGate(MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_STALE_SEC)
+        self.last_result = (0, "away", False, [])  # faces, gaze, phone, phone boxes
+        # trackers keep per-client history but share the worker's models
+        self.face_tracker = None
+        self.phone_scheduler = None
+
+        # newest-frame-wins: a frame that arrives while one is waiting replaces it
+        self.lock = threading.Lock()
+        self.pending = None
+        self.queued = False
+        self.frames_in = 0
+        self.frames_dropped = 0
+        self.frames_done = 0
+
+
+# ===== Worker pool =====
+class FrameWorker(threading.Thread):
+    """One FaceMesh + phone detector; analyzes frames of the clients pinned to it."""
+
+    def __init__(self, index):
+        super().__init__(name=f"frame-worker-{index}", daemon=True)
+        self.queue = queue.Queue()
+        self.clients = 0
+        self.failed = False  # models didn't load: takes no sessions
+        self.face_mesh = None
+        self.phone_detector = None
+
+    def load_models(self):
+        cv2.setNumThreads(1)  # process-wide; parallelism comes from the workers
+        # shared by every session on this worker (full frames and ROI crops of
+        # different clients), so no per-call tracking state: static image mode
+        self.face_mesh = mp_face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True, max_num_faces=2)
+        self.phone_detector = create_phone_detector(
+            PHONE_DETECTOR_BACKEND, mode=PHONE_DETECTOR_MODE, imgsz=PHONE_DETECTOR_IMGSZ,
+            threads=THREADS_PER_WORKER)
+
+    def attach(self, session):
+        session.face_tracker = RoiFaceMesh(
+            self.face_mesh,
+            self.face_mesh,
+            margin=FACE_ROI_MARGIN,
+            max_side=FACE_MAX_SIDE,
+            full_frame_every=FACE_FULL_FRAME_EVERY,
+        )
+        session.phone_scheduler = PhoneScheduler(
+            self.phone_detector,
+            idle_every_n=PHONE_DETECT_EVERY_N,
+            active_every_n=PHONE_DETECT_EVERY_N_ACTIVE,
+            motion_threshold=PHONE_MOTION_THRESHOLD,
+        )
+
+    def run(self):
+        try:
+            self.load_models()
+        except Exception as e:
+            print(f"⚠️ {self.name} could not load its models: {e}")
+            self.failed = True
+            reroute_sessions(self)
+            return
+        while True:
+            session = self.queue.get()
+            with session.lock:
+                data, session.pending, session.queued = session.pending, None, False
+            if data is None or sessions.get(session.sid) is not session:
+                continue  # client left meanwhile
+            if session.face_tracker is None:
+                self.attach(session)
+            try:
+                result = analyze_frame(session, data)
+            except Exception as e:
+                print("⚠️ Error:", e)
+                continue
+            if result is not None:
+                session.frames_done += 1
+                socketio.emit("analysis", json.dumps(result), to=session.sid)
+
+
+workers = [FrameWorker(i) for i in range(max(1, FRAME_WORKERS))]
+sessions = {}
+sessions_lock = threading.Lock()
+
+
+def start_workers():
+    for w in workers:
+        if not w.is_alive() and not w.failed:
+            w.start()
+
+
+def pick_worker():
+    # least busy worker whose models loaded (or are still loading); call with sessions_lock held
+    live = [w for w in workers if not w.failed]
+    if not live:
+        return None
+    return min(live, key=lambda w: w.clients)
+
+
+def reroute_sessions(dead):
+    """Move the sessions of a worker that failed to start onto the others."""
+    with sessions_lock:
+        for session in sessions.values():
+            if session.worker is not dead:
+                continue
+            worker = pick_worker()
+            if worker is None:
+                print("⚠️ No frame worker could load the models; frames are not analyzed")
+                break
+            with session.lock:
+                dead.clients -= 1
+                worker.clients += 1
+                session.worker = worker
+    # frames queued on the dead worker before the move
+    while True:
+        try:
+            session = dead.queue.get_nowait()
+        except queue.Empty:
+            break
+        if session.worker is not dead:
+            session.worker.queue.put(session)
 
 
 # ===== Utilities =====
@@ -54,124 +190,107 @@ def play_alert():
     print("\a")
 
 
-def get_head_pose(landmarks, img_shape):
-    h, w = img_shape
-    nose = np.array([landmarks[1].x * w, landmarks[1].y * h])
-    chin = np.array([landmarks[152].x * w, landmarks[152].y * h])
-    left_ear = np.array([landmarks[234].x * w, landmarks[234].y * h])
-    right_ear = np.array([landmarks[454].x * w, landmarks[454].y * h])
-
-    dy = chin[1] - nose[1]
-    dx = chin[0] - nose[0]
-    pitch_angle = np.degrees(np.arctan2(dy, dx))
-
-    dist_left = np.linalg.norm(nose - left_ear)
-    dist_right = np.linalg.norm(nose - right_ear)
-    yaw_ratio = dist_left / (dist_right + 1e-6)
-
-    if 0.7 < yaw_ratio < 1.3:
-        if -15 < pitch_angle < 15:
-            return "screen"
-        elif pitch_angle > 15:
-            return "notebook"
-        else:
-            return "away"
+# ======= Frame analysis (runs on a worker thread) =======
+def analyze_frame(session, data):
+    # Decode frame: raw JPEG bytes (binary event) or a base64 string from old clients
+    frame = decode_frame(data)
+    if frame is None:
+        return None
+
+    # Skip the models entirely while the picture hasn't changed
+    if session.motion_gate.check(frame):
+        # Detect faces (cropped to the last face when we have one)
+        faces = session.face_tracker.process(frame)
+        faces_detected = len(faces)
+        gaze_status = "away"
+
+        if faces_detected == 1:
+            gaze_status = head_pose_from_points(faces[0], frame.shape[:2])
+
+        # YOLO phone detection (every few frames, tracked in between)
+        phone_detected, phone_boxes = session.phone_scheduler.update(frame)
+        session.last_result = (faces_detected, gaze_status, phone_detected, phone_boxes)
     else:
-        return "away"
+        faces_detected, gaze_status, phone_detected, phone_boxes = session.last_result
 
+    # Focus status + score (per-second rates, so clients sending at different
+    # frame rates are scored the same)
+    now = time.time()
+    code, focus_score = session.focus_engine.update(now, faces_detected, gaze_status, phone_detected)
+    focused = is_focused(code)
 
-# ======= Socket Event: receive frames from frontend =======
-@socketio.on("frame")
-def handle_frame(data):
-    global look_away_start, focus_score, last_alert_time
+    # Alert (beep)
+    if (not focused or phone_detected) and (now - session.last_alert_time) >= ALERT_COOLDOWN_SEC:
+        play_alert()
+        session.last_alert_time = now
 
-    try:
-        # Decode frame
-        img_bytes = base64.b64decode(data)
-        img = Image.open(io.BytesIO(img_bytes))
-        frame = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+    # Analysis result for this client only
+    return {
+        "focused": focused,
+        "faces_count": faces_detected,
+        "phone_detected": phone_detected,
+        "focus_score": focus_score,
+        "status": STATUS_LABELS[code],
+        "gaze_status": gaze_status
+    }
 
-        # Detect faces
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = face_mesh.process(rgb)
-        faces_detected = 0
-        gaze_status = "away"
 
-        if result.multi_face_landmarks:
-            faces_detected = len(result.multi_face_landmarks)
-            if faces_detected == 1:
-                landmarks = result.multi_face_landmarks[0].landmark
-                gaze_status = get_head_pose(landmarks, frame.shape[:2])
-
-        # YOLO phone detection
-        phone_detected = False
-        results = yolo_model(frame, verbose=False)
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                if r.names[cls] == "cell phone" and conf > 0.5:
-                    phone_detected = True
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    cv2.putText(frame, "Phone", (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-        # Focus logic
-        if gaze_status == "away":
-            if look_away_start is None:
-                look_away_start = time.time()
-        else:
-            look_away_start = None
-
-        away_long = (
-            look_away_start and (time.time() - look_away_start >= AWAY_THRESHOLD)
-        )
+# ======= Socket Events =======
+@socketio.on("connect")
+def handle_connect():
+    start_workers()
+    with sessions_lock:
+        worker = pick_worker() or workers[0]  # pin to the least busy worker
+        worker.clients += 1
+        sessions[request.sid] = ClientSession(request.sid, worker)
+
+
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    with sessions_lock:
+        session = sessions.pop(request.sid, None)
+        if session is not None:
+            session.worker.clients -= 1
+
+
+@socketio.on("frame")
+def handle_frame(data):
+    """Hand the frame to the client's worker and return at once."""
+    session = sessions.get(request.sid)
+    if session is None:
+        handle_connect()
+        session = sessions[request.sid]
+    with session.lock:
+        session.frames_in += 1
+        if session.pending is not None:
+            session.frames_dropped += 1  # worker hasn't got to the previous one yet
+        session.pending = data
+        if session.queued:
+            return
+        session.queued = True
+        # under the lock, so reroute_sessions() can't move the session in between
+        session.worker.queue.put(session)
+
 
-        # Define focus status
-        if faces_detected != 1:
-            status = "Not Focused (Multiple/No Face)"
-            color = (0, 0, 255)
-        elif phone_detected:
-            status = "Not Focused (Phone Detected)"
-            color = (0, 0, 255)
-        elif gaze_status in ["screen", "notebook"]:
-            status = f"Focused ({gaze_status})"
-            color = (0, 255, 0)
-        elif away_long:
-            status = "Not Focused (Looking Away)"
-            color = (0, 0, 255)
-        else:
-            status = "Focused (temporary glance away)"
-            color = (0, 255, 255)
-
-        # Focus score logic
-        if "Not Focused" in status or phone_detected:
-            focus_score = max(FOCUS_MIN, focus_score - 2)
-        else:
-            focus_score = min(FOCUS_MAX, focus_score + 1)
-
-        # Alert (beep)
-        if ("Not Focused" in status or phone_detected) and (time.time() - last_alert_time) >= ALERT_COOLDOWN_SEC:
-            play_alert()
-            last_alert_time = time.time()
-
-        # Send analysis result to frontend
-        emit("analysis", json.dumps({
-            "focused": "Not" not in status,
-            "faces_count": faces_detected,
-            "phone_detected": phone_detected,
-            "focus_score": focus_score,
-            "status": status,
-            "gaze_status": gaze_status
-        }))
-
-    except Exception as e:
-        print("⚠️ Error:", e)
+@app.route("/stats")
+def stats():
+    with sessions_lock:
+        clients = {
+            sid: {
+                "worker": s.worker.name,
+                "frames_in": s.frames_in,
+                "frames_done": s.frames_done,
+                "frames_dropped": s.frames_dropped,
+                "focus_score": s.focus_engine.focus_score,
+            }
+            for sid, s in sessions.items()
+        }
+    return {"workers": len(workers), "failed_workers": sum(w.failed for w in workers), "clients": clients}
 
 
 # ======= Optional: Run directly with webcam for testing =======
 def run_local_test():
+    face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=2)
     cap = cv2.VideoCapture(0)
     print("📹 Running local camera mode (press Q to quit)")
 